@@ -2,10 +2,10 @@ from typing import Generator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.security import AuthServiceUnavailableError, InvalidTokenError, verify_token
 from app.db.session import SessionLocal
 
 # OAuth2 scheme for token authentication
@@ -27,8 +27,9 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     """
     Validate the access token and return the current user
     
-    This is a simplified implementation. In a real-world scenario,
-    you would likely make an API call to the auth service to validate the token.
+    Depending on AUTH_VALIDATION_MODE the token is verified locally or by the auth
+    service. Verified claims are cached until the token expires, so repeated calls
+    with the same token skip signature verification and remote round trips.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,17 +38,18 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     )
     
     try:
-        # Decode the JWT token
-        payload = jwt.decode(
-            token, 
-            settings.JWT_SECRET_KEY, 
-            algorithms=[settings.JWT_ALGORITHM]
+        payload = await verify_token(token)
+    except InvalidTokenError:
+        raise credentials_exception
+    except AuthServiceUnavailableError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Auth service unavailable",
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        
-        # Return the user ID from the token
-        return {"user_id": user_id}
-    except JWTError:
-        raise credentials_exception
\ No newline at end of file
+
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        raise credentials_exception
+    
+    # Return the user ID from the token
+    return {"user_id": user_id}
\ No newline at end of file
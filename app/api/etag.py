@@ -0,0 +1,94 @@
+import hashlib
+from typing import Any, Iterable, List, Optional, Tuple
+
+from fastapi import Response, status
+
+from app.db.versioning import row_version
+
+ETAG_HEADER = "ETag"
+
+# Headers of the route's response that also belong on a 304
+_NOT_MODIFIED_SKIP_HEADERS = {"content-length", "content-type"}
+
+
+def etag_for(obj: Any) -> str:
+    """
+    Build the strong ETag of a domain or application row from its id and last write time
+
+    Args:
+        obj: A model instance or row with id, created_at and updated_at
+    """
+    return f'"{obj.id:x}-{row_version(obj):x}"'
+
+
+def etag_for_many(objs: Iterable[Any], extra: Optional[str] = None) -> str:
+    """
+    Build the ETag of a list response from the ETags of its rows
+
+    Args:
+        objs: The rows in response order
+        extra: Other response content the ETag must change with, e.g. the page total
+    """
+    digest = hashlib.sha1()
+    for obj in objs:
+        digest.update(etag_for(obj).encode("ascii"))
+    if extra is not None:
+        digest.update(extra.encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+def _parse_etags(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def not_modified(response: Response, etag: str, if_none_match: Optional[str]) -> Optional[Response]:
+    """
+    Set the ETag header and return a 304 response when the client's copy is current
+
+    Args:
+        response: The route's response, whose headers are copied onto the 304
+        etag: The current ETag of the resource
+        if_none_match: The If-None-Match request header
+    """
+    response.headers[ETAG_HEADER] = etag
+    if if_none_match is None:
+        return None
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    tags = {tag[2:] if tag.startswith("W/") else tag for tag in _parse_etags(if_none_match)}
+    if "*" not in tags and etag not in tags:
+        return None
+    headers = {
+        key: value for key, value in response.headers.items() if key.lower() not in _NOT_MODIFIED_SKIP_HEADERS
+    }
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def _parse_row_etag(tag: str) -> Optional[Tuple[int, int]]:
+    # Inverse of etag_for: '"{id:x}-{version:x}"' -> (id, version); None for weak or other tags
+    if len(tag) < 2 or tag[0] != '"' or tag[-1] != '"':
+        return None
+    try:
+        row_id, version = tag[1:-1].split("-")
+        return int(row_id, 16), int(version, 16)
+    except ValueError:
+        return None
+
+
+def if_match_versions(if_match: Optional[str]) -> Optional[List[Tuple[int, int]]]:
+    """
+    Parse an If-Match header into the (id, version) pairs a write is restricted to
+
+    If-Match uses the strong comparison, so weak and unparsable tags never match and
+    are dropped; a header naming none of our ETags yields an empty list.
+
+    Args:
+        if_match: The If-Match request header
+
+    Returns None when any version is acceptable (no header, or *).
+    """
+    if if_match is None:
+        return None
+    tags = _parse_etags(if_match)
+    if "*" in tags:
+        return None
+    return [parsed for parsed in map(_parse_row_etag, tags) if parsed is not None]
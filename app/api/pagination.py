@@ -0,0 +1,64 @@
+import base64
+import json
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+
+# Response header carrying the opaque cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(**position: Any) -> str:
+    """
+    Encode a keyset position (e.g. the last id of a page) as an opaque cursor
+
+    Args:
+        position: The ordering columns of the last row returned
+    """
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises a 400 error if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(position, dict) or not isinstance(position.get("id"), int):
+            raise ValueError(cursor)
+        return position
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def decode_search_cursor(cursor: str, q: str) -> Tuple[float, int]:
+    """
+    Decode the cursor of a ranked search page into its (rank, id) position
+
+    Raises a 400 error if the cursor is malformed or was issued for a different query.
+    """
+    position = decode_cursor(cursor)
+    if position.get("q") != q or not isinstance(position.get("rank"), (int, float)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor does not belong to this search")
+    return float(position["rank"]), position["id"]
+
+
+def set_next_cursor(response: Response, rows: Sequence[Any], limit: int, **position: Any) -> Optional[str]:
+    """
+    Set the next-page cursor header when the page is full
+
+    Args:
+        response: The outgoing response
+        rows: The rows of the current page, in keyset order
+        limit: The page size that was requested
+        position: Extra ordering columns to embed in the cursor (e.g. domain_name)
+    """
+    if not rows or len(rows) < limit:
+        return None
+    cursor = encode_cursor(**position, id=rows[-1].id)
+    response.headers[NEXT_CURSOR_HEADER] = cursor
+    return cursor
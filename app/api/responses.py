@@ -0,0 +1,63 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.engine import Row
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used without it
+    orjson = None
+
+# Headers of the route's response that describe the body it would have had
+_BODY_HEADERS = {"content-length", "content-type"}
+
+# OPT_UTC_Z writes UTC offsets as Z, like Pydantic does
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when it is installed, falling back to the stdlib json"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, option=_ORJSON_OPTIONS)
+
+
+def rows_response(
+    response: Response, rows: Iterable[Row], envelope: Optional[Dict[str, Any]] = None
+) -> FastJSONResponse:
+    """
+    Render plain rows as a JSON array without validating them against the response model
+
+    The rows must carry exactly the fields of the route's response_model, e.g. the result of
+    select(*Model.__table__.columns) for a model whose schema mirrors its table.
+
+    Args:
+        response: The route's response; headers already set on it (cursor, ETag) are kept
+        rows: The rows of the page
+        envelope: Page metadata (total, next_cursor); when given the rows are wrapped as
+            {"items": [...], **envelope}
+    """
+    headers = {key: value for key, value in response.headers.items() if key.lower() not in _BODY_HEADERS}
+    content: Any = [dict(row._mapping) for row in rows]
+    if envelope is not None:
+        content = {"items": content, **envelope}
+    return FastJSONResponse(content, headers=headers)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def ndjson_lines(rows: Iterable[Row]) -> bytes:
+    """Encode plain rows as newline-delimited JSON, one row per line, with orjson when it is installed"""
+    if orjson is None:
+        return "".join(json.dumps(dict(row._mapping), default=_json_default) + "\n" for row in rows).encode("utf-8")
+    return b"".join(orjson.dumps(dict(row._mapping), option=_ORJSON_OPTIONS) + b"\n" for row in rows)
@@ -1,58 +1,258 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional, Union
 
-from app.db.session import get_db
-from app.schemas.application import ApplicationCreate, ApplicationUpdate, ApplicationResponse
-from app.crud.application import create_application, get_application, get_all_applications, update_application, delete_application, fetch_applications_by_domain_name
+from app.api.etag import ETAG_HEADER, etag_for, etag_for_many, if_match_versions, not_modified
+from app.api.pagination import decode_cursor, decode_search_cursor, encode_cursor, set_next_cursor
+from app.api.responses import ndjson_lines, rows_response
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, get_async_db
+from app.schemas.application import (
+    ApplicationCreate, ApplicationUpdate, ApplicationResponse, ApplicationBulkCreate, ApplicationBulkResponse,
+    ApplicationPage, ApplicationBulkUpdate, ApplicationBulkUpdateResponse
+)
+from app.schemas.common import TotalMode
+from app.crud.application import (
+    create_application_async, get_application_async, get_all_applications_async, update_application_async,
+    delete_application_async, fetch_applications_by_domain_name_async, bulk_create_applications_async,
+    stream_applications_async, search_applications_async, filter_applications_by_config_async,
+    count_applications_async, bulk_update_applications_async
+)
+from app.crud.domain import get_domain_by_name_async
 
 router = APIRouter(prefix="/applications", tags=["applications"])
 
 @router.post("/create_application/", response_model=ApplicationResponse, status_code=status.HTTP_201_CREATED)
-async def create_new_application(application: ApplicationCreate, db: Session = Depends(get_db)):
+async def create_new_application(application: ApplicationCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new application"""
-    db_application = create_application(db=db, application=application)
+    db_application = await create_application_async(db=db, application=application)
     return db_application
 
+@router.post("/bulk", response_model=ApplicationBulkResponse)
+async def create_applications_bulk(batch: ApplicationBulkCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create many applications in one transaction, reporting rejected items individually"""
+    created, errors = await bulk_create_applications_async(db=db, applications=batch.items)
+    return {"created": created, "errors": errors}
+
+@router.patch("/bulk", response_model=ApplicationBulkUpdateResponse)
+async def update_applications_bulk(batch: ApplicationBulkUpdate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Apply the same changes to many applications in one statement.
+    Select them by `ids` or by `domain_name`, optionally narrowed by `filter`; reports the updated ids.
+    A domain is updated at most `limit` applications at a time: while `next_cursor` is
+    returned, send the same request again with it as `cursor`.
+    """
+    after_id = None
+    if batch.cursor:
+        position = decode_cursor(batch.cursor)
+        if batch.domain_name is None or position.get("domain_name") != batch.domain_name:
+            raise HTTPException(status_code=400, detail="Cursor does not belong to this domain")
+        after_id = position["id"]
+    updated_ids = await bulk_update_applications_async(
+        db=db,
+        changes=batch.changes,
+        ids=batch.ids,
+        domain_name=batch.domain_name,
+        filter=batch.filter,
+        limit=batch.limit,
+        after_id=after_id,
+    )
+    next_cursor = None
+    if batch.domain_name is not None and len(updated_ids) == batch.limit:
+        next_cursor = encode_cursor(domain_name=batch.domain_name, id=updated_ids[-1])
+    return {"updated": len(updated_ids), "ids": updated_ids, "next_cursor": next_cursor}
+
+async def _export_ndjson(domain_name: Optional[str], status: Optional[bool]) -> AsyncIterator[bytes]:
+    # The session is owned by the generator because the response body outlives the request handler
+    async with AsyncSessionLocal() as db:
+        async for rows in stream_applications_async(db=db, domain_name=domain_name, status=status):
+            yield ndjson_lines(rows)
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_applications(domain_name: Optional[str] = None, status: Optional[bool] = None):
+    """Stream the application catalog as newline-delimited JSON, one application per line"""
+    return StreamingResponse(_export_ndjson(domain_name, status), media_type="application/x-ndjson")
+
+@router.get("/search", response_model=List[ApplicationResponse])
+async def search_applications(
+    response: Response,
+    q: str = Query(
+        ..., min_length=3, max_length=100, description="Text to find in the name, code or description, at least 3 characters"
+    ),
+    domain_name: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Search applications by name, code or description, best matches first.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    """
+    after = decode_search_cursor(cursor, q) if cursor else None
+    results = await search_applications_async(db=db, q=q, domain_name=domain_name, limit=limit, after=after)
+    applications = [db_application for db_application, _ in results]
+    if results:
+        set_next_cursor(response, applications, limit, q=q, rank=results[-1][1])
+    return applications
+
+@router.get("/by_config", response_model=List[ApplicationResponse])
+async def get_applications_by_config(
+    response: Response,
+    contains: str = Query(
+        ..., max_length=2000, description='JSON object the config must contain, e.g. {"features": {"x": true}}'
+    ),
+    domain_name: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get the applications whose config contains the given keys and values, ordered by id.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    """
+    try:
+        wanted = json.loads(contains)
+    except ValueError:
+        wanted = None
+    if not isinstance(wanted, dict):
+        raise HTTPException(status_code=400, detail="contains must be a JSON object")
+    after_id = decode_cursor(cursor)["id"] if cursor else None
+    applications = await filter_applications_by_config_async(
+        db=db, contains=wanted, domain_name=domain_name, limit=limit, after_id=after_id
+    )
+    set_next_cursor(response, applications, limit)
+    return applications
+
 @router.get("/get_application/{application_id}", response_model=ApplicationResponse)
-async def read_application(application_id: int, db: Session = Depends(get_db)):
-    """Get application by ID"""
-    db_application = get_application(db=db, application_id=application_id)
+async def read_application(
+    application_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get application by ID.
+    Returns 304 when If-None-Match matches the current ETag.
+    """
+    db_application = await get_application_async(db=db, application_id=application_id)
     if db_application is None:
         raise HTTPException(status_code=404, detail="Application not found")
+    cached = not_modified(response, etag_for(db_application), if_none_match)
+    if cached is not None:
+        return cached
     return db_application
 
 
-@router.get("/get_applications_by_domain_name/{domain_name}", response_model=List[ApplicationResponse])
+@router.get(
+    "/get_applications_by_domain_name/{domain_name}", response_model=Union[List[ApplicationResponse], ApplicationPage]
+)
 async def get_applications_by_domain_name(
-    domain_name: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+    domain_name: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: Optional[int] = Query(None, deprecated=True, description="Use cursor instead"),
+    total: Optional[TotalMode] = Query(None, description="Wrap the page in an envelope with the total row count"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Get applications by domain name with pagination"""
-    db_applications = fetch_applications_by_domain_name(db=db, domain_name=domain_name, skip=skip, limit=limit)
-    if not db_applications:
+    """
+    Get applications by domain name ordered by id.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    With `total` the page is returned as {items, total, total_is_estimate, next_cursor}.
+    Returns 304 when If-None-Match matches the current ETag of the page.
+    """
+    after_id = None
+    if cursor:
+        position = decode_cursor(cursor)
+        if position.get("domain_name") != domain_name:
+            raise HTTPException(status_code=400, detail="Cursor does not belong to this domain")
+        after_id = position["id"]
+    as_rows = settings.FAST_LIST_RESPONSES
+    db_applications = await fetch_applications_by_domain_name_async(
+        db=db, domain_name=domain_name, skip=skip or 0, limit=limit, after_id=after_id, as_rows=as_rows
+    )
+    # A domain without applications is an empty page, only an unknown domain is a 404
+    if not db_applications and not cursor and await get_domain_by_name_async(db=db, domain_name=domain_name) is None:
         raise HTTPException(status_code=404, detail="Applications domain name not found")
+    next_cursor = set_next_cursor(response, db_applications, limit, domain_name=domain_name)
+    envelope = None
+    if total is not None:
+        count, is_estimate = await count_applications_async(
+            db=db, domain_name=domain_name, approximate=total == TotalMode.approximate
+        )
+        envelope = {"total": count, "total_is_estimate": is_estimate, "next_cursor": next_cursor}
+    cached = not_modified(
+        response, etag_for_many(db_applications, extra=envelope and str(envelope["total"])), if_none_match
+    )
+    if cached is not None:
+        return cached
+    if as_rows:
+        return rows_response(response, db_applications, envelope)
+    if envelope is not None:
+        return {"items": db_applications, **envelope}
     return db_applications
 
-@router.get("/get_all_applications", response_model=List[ApplicationResponse])
-async def read_applications(skip: int = 0, limit: int = 100,db: Session = Depends(get_db)):
-    """Get all applications with optional domain filter and pagination"""
-    applications = get_all_applications(db=db, skip=skip, limit=limit)
+@router.get("/get_all_applications", response_model=Union[List[ApplicationResponse], ApplicationPage])
+async def read_applications(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: Optional[int] = Query(None, deprecated=True, description="Use cursor instead"),
+    total: Optional[TotalMode] = Query(None, description="Wrap the page in an envelope with the total row count"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get all applications ordered by id.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    With `total` the page is returned as {items, total, total_is_estimate, next_cursor}.
+    Returns 304 when If-None-Match matches the current ETag of the page.
+    """
+    after_id = decode_cursor(cursor)["id"] if cursor else None
+    as_rows = settings.FAST_LIST_RESPONSES
+    applications = await get_all_applications_async(
+        db=db, skip=skip or 0, limit=limit, after_id=after_id, as_rows=as_rows
+    )
+    next_cursor = set_next_cursor(response, applications, limit)
+    envelope = None
+    if total is not None:
+        count, is_estimate = await count_applications_async(db=db, approximate=total == TotalMode.approximate)
+        envelope = {"total": count, "total_is_estimate": is_estimate, "next_cursor": next_cursor}
+    cached = not_modified(response, etag_for_many(applications, extra=envelope and str(envelope["total"])), if_none_match)
+    if cached is not None:
+        return cached
+    if as_rows:
+        return rows_response(response, applications, envelope)
+    if envelope is not None:
+        return {"items": applications, **envelope}
     return applications
 
 @router.put("/update_application/{application_id}", response_model=ApplicationResponse)
-async def update_existing_application(application_id: int, application: ApplicationUpdate, db: Session = Depends(get_db)):
-    """Update an application"""
-    db_application = get_application(db=db, application_id=application_id)
-    if db_application is None:
-        raise HTTPException(status_code=404, detail="Application not found")
-    updated_application = update_application(db=db, application_id=application_id, application=application)
+async def update_existing_application(
+    application_id: int,
+    application: ApplicationUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Update an application.
+    Returns 412 when If-Match is sent and does not match the current ETag.
+    """
+    updated_application = await update_application_async(
+        db=db,
+        application_id=application_id,
+        application=application,
+        expected_versions=if_match_versions(if_match),
+    )
+    response.headers[ETAG_HEADER] = etag_for(updated_application)
     return updated_application
 
 @router.delete("/delete_application/{application_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_existing_application(application_id: int, db: Session = Depends(get_db)):
+async def delete_existing_application(application_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete an application"""
-    db_application = get_application(db=db, application_id=application_id)
-    if db_application is None:
-        raise HTTPException(status_code=404, detail="Application not found")
-    delete_application(db=db, application_id=application_id)
+    await delete_application_async(db=db, application_id=application_id)
     return None
\ No newline at end of file
@@ -1,50 +1,173 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 
-from app.db.session import get_db
-from app.schemas.domain import DomainCreate, DomainUpdate, DomainResponse
-from app.crud.domain import create_domain, get_domain, get_domains, update_domain, delete_domain
-from app.events.producers.domain_created import publish_domain_created_event
+from app.api.etag import ETAG_HEADER, etag_for, etag_for_many, if_match_versions, not_modified
+from app.api.pagination import decode_cursor, decode_search_cursor, set_next_cursor
+from app.api.responses import rows_response
+from app.core.config import settings
+from app.db.session import get_async_db
+from app.schemas.domain import (
+    DomainCreate, DomainUpdate, DomainResponse, DomainBulkCreate, DomainBulkResponse, DomainInclude,
+    DomainWithApplicationsResponse, DomainPage, DomainStatsResponse
+)
+from app.schemas.common import TotalMode
+from app.crud.domain import (
+    create_domain_async, get_domain_async, get_domains_async, update_domain_async, delete_domain_async,
+    bulk_create_domains_async, get_domain_cache_stats, search_domains_async, count_domains_async
+)
+from app.crud.domain_stats import get_domain_stats_async
 
 router = APIRouter(prefix="/domains", tags=["domains"])
 
+def _domain_response(db_domain, include: Optional[DomainInclude]):
+    # Without include the lazy applications relationship must not be touched, as it
+    # cannot load on an async session; the route's response_model_exclude_unset then
+    # leaves the key out of the body
+    if include == DomainInclude.applications:
+        return DomainWithApplicationsResponse.model_validate(db_domain)
+    return DomainResponse.model_validate(db_domain)
+
 @router.post("/create_domain/", response_model=DomainResponse, status_code=status.HTTP_201_CREATED)
-async def create_new_domain(domain: DomainCreate, db: Session = Depends(get_db)):
+async def create_new_domain(domain: DomainCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new domain"""
-    db_domain = create_domain(db=db, domain=domain)
-    # Publish domain created event
-    await publish_domain_created_event(domain_id=db_domain.id, domain_name=db_domain.domain_name)
+    db_domain = await create_domain_async(db=db, domain=domain)
     return db_domain
 
-@router.get("/get_domain/{domain_id}", response_model=DomainResponse)
-async def read_domain(domain_id: int, db: Session = Depends(get_db)):
-    """Get domain by ID"""
-    db_domain = get_domain(db=db, domain_id=domain_id)
-    if db_domain is None:
-        raise HTTPException(status_code=404, detail="Domain not found")
-    return db_domain
+@router.post("/bulk", response_model=DomainBulkResponse)
+async def create_domains_bulk(batch: DomainBulkCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create many domains in one transaction, reporting rejected items individually"""
+    created, errors = await bulk_create_domains_async(db=db, domains=batch.items)
+    return {"created": created, "errors": errors}
 
-@router.get("/get_all_domains/", response_model=List[DomainResponse])
-async def read_domains(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all domains with pagination"""
-    domains = get_domains(db=db, skip=skip, limit=limit)
+@router.get("/search", response_model=List[DomainResponse])
+async def search_domains(
+    response: Response,
+    q: str = Query(
+        ..., min_length=3, max_length=100, description="Text to find in the name, code or description, at least 3 characters"
+    ),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Search domains by name, code or description, best matches first.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    """
+    after = decode_search_cursor(cursor, q) if cursor else None
+    results = await search_domains_async(db=db, q=q, limit=limit, after=after)
+    domains = [db_domain for db_domain, _ in results]
+    if results:
+        set_next_cursor(response, domains, limit, q=q, rank=results[-1][1])
     return domains
 
-@router.put("/update_domain/{domain_id}", response_model=DomainResponse)
-async def update_existing_domain(domain_id: int, domain: DomainUpdate, db: Session = Depends(get_db)):
-    """Update a domain"""
-    db_domain = get_domain(db=db, domain_id=domain_id)
+@router.get("/stats", response_model=List[DomainStatsResponse])
+async def read_domain_stats(domain_name: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get application counts per domain, split by status and action.
+    Served from the domain_application_stats summary table, one row per domain, status and action.
+    """
+    return await get_domain_stats_async(db=db, domain_name=domain_name)
+
+@router.get("/get_domain/{domain_id}", response_model=DomainWithApplicationsResponse, response_model_exclude_unset=True)
+async def read_domain(
+    domain_id: int,
+    response: Response,
+    include: Optional[DomainInclude] = Query(None, description="Embed related objects in the response"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get domain by ID, optionally with its applications.
+    Returns 304 when If-None-Match matches the current ETag.
+    """
+    db_domain = await get_domain_async(
+        db=db, domain_id=domain_id, include_applications=include == DomainInclude.applications
+    )
     if db_domain is None:
         raise HTTPException(status_code=404, detail="Domain not found")
-    updated_domain = update_domain(db=db, domain_id=domain_id, domain=domain)
+    if include == DomainInclude.applications:
+        etag = etag_for_many([db_domain, *db_domain.applications])
+    else:
+        etag = etag_for(db_domain)
+    cached = not_modified(response, etag, if_none_match)
+    if cached is not None:
+        return cached
+    return _domain_response(db_domain, include)
+
+@router.get(
+    "/get_all_domains/",
+    response_model=Union[List[DomainWithApplicationsResponse], DomainPage],
+    response_model_exclude_unset=True,
+)
+async def read_domains(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    include: Optional[DomainInclude] = Query(None, description="Embed related objects in the response"),
+    skip: Optional[int] = Query(None, deprecated=True, description="Use cursor instead"),
+    total: Optional[TotalMode] = Query(None, description="Wrap the page in an envelope with the total row count"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get all domains ordered by id, optionally with their applications.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
+    With `total` the page is returned as {items, total, total_is_estimate, next_cursor}.
+    Returns 304 when If-None-Match matches the current ETag of the page.
+    """
+    after_id = decode_cursor(cursor)["id"] if cursor else None
+    # Embedded applications need the model instances
+    as_rows = settings.FAST_LIST_RESPONSES and include is None
+    domains = await get_domains_async(
+        db=db, skip=skip or 0, limit=limit, after_id=after_id,
+        include_applications=include == DomainInclude.applications, as_rows=as_rows,
+    )
+    next_cursor = set_next_cursor(response, domains, limit)
+    envelope = None
+    if total is not None:
+        count, is_estimate = await count_domains_async(db=db, approximate=total == TotalMode.approximate)
+        envelope = {"total": count, "total_is_estimate": is_estimate, "next_cursor": next_cursor}
+    extra = envelope and str(envelope["total"])
+    if include == DomainInclude.applications:
+        etag = etag_for_many((obj for db_domain in domains for obj in (db_domain, *db_domain.applications)), extra=extra)
+    else:
+        etag = etag_for_many(domains, extra=extra)
+    cached = not_modified(response, etag, if_none_match)
+    if cached is not None:
+        return cached
+    if as_rows:
+        return rows_response(response, domains, envelope)
+    items = [_domain_response(db_domain, include) for db_domain in domains]
+    if envelope is not None:
+        return {"items": items, **envelope}
+    return items
+
+@router.put("/update_domain/{domain_id}", response_model=DomainResponse)
+async def update_existing_domain(
+    domain_id: int,
+    domain: DomainUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Update a domain.
+    Returns 412 when If-Match is sent and does not match the current ETag.
+    """
+    updated_domain = await update_domain_async(
+        db=db, domain_id=domain_id, domain=domain, expected_versions=if_match_versions(if_match)
+    )
+    response.headers[ETAG_HEADER] = etag_for(updated_domain)
     return updated_domain
 
 @router.delete("/delete_domain/{domain_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_existing_domain(domain_id: int, db: Session = Depends(get_db)):
+async def delete_existing_domain(domain_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a domain"""
-    db_domain = get_domain(db=db, domain_id=domain_id)
-    if db_domain is None:
-        raise HTTPException(status_code=404, detail="Domain not found")
-    delete_domain(db=db, domain_id=domain_id)
+    await delete_domain_async(db=db, domain_id=domain_id)
     return None
+
+@router.get("/cache_stats")
+async def read_domain_cache_stats():
+    """Get hit/miss counters of the domain lookup cache"""
+    return get_domain_cache_stats()
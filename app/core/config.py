@@ -31,16 +31,106 @@ class Settings(BaseSettings):
         if isinstance(v, str):
             return v
         return f"postgresql://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@{values.get('POSTGRES_SERVER')}/{values.get('POSTGRES_DB')}"
+
+    # Async driver URL used by the request path; derived from the sync URL unless set explicitly
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+
+    @validator("SQLALCHEMY_ASYNC_DATABASE_URI", pre=True)
+    def assemble_async_db_connection(cls, v: Optional[str], values: dict) -> str:
+        if isinstance(v, str):
+            return v
+        sync_uri = values.get("SQLALCHEMY_DATABASE_URI") or ""
+        for sync_prefix, async_prefix in (
+            ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+            ("postgresql://", "postgresql+asyncpg://"),
+            ("sqlite://", "sqlite+aiosqlite://"),
+        ):
+            if sync_uri.startswith(sync_prefix):
+                return async_prefix + sync_uri[len(sync_prefix):]
+        return sync_uri
     
+    # Create missing tables on startup; for local development only, the schema is managed
+    # by the Alembic migrations in app/db/migrations
+    DB_CREATE_ALL_ON_STARTUP: bool = os.getenv("DB_CREATE_ALL_ON_STARTUP", "false").lower() == "true"
+
+    # Connection pool, applied to both the sync and the async engine (each has its own pool)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    # Recycle connections older than this; -1 keeps them until they fail
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "-1"))
+    # Test connections with a round trip on checkout; cheaper alternatives are a recycle
+    # shorter than the server/load balancer idle timeout, or pgbouncer mode
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Open DB_POOL_SIZE async connections on startup instead of on the first requests
+    DB_POOL_PREWARM: bool = os.getenv("DB_POOL_PREWARM", "true").lower() == "true"
+    # asyncpg prepared statement cache per connection
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    # Transaction-pooling mode for PgBouncer: no client-side pool (NullPool) and no prepared
+    # statements cached across transactions
+    DB_PGBOUNCER_MODE: bool = os.getenv("DB_PGBOUNCER_MODE", "false").lower() == "true"
+
+    # Per-request SQL instrumentation: X-DB-Query-Count / X-DB-Time-Ms headers and
+    # a slow-query log for statements slower than DB_SLOW_QUERY_MS
+    DB_QUERY_STATS_HEADERS: bool = os.getenv("DB_QUERY_STATS_HEADERS", "true").lower() == "true"
+    DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+
+    # Serve list routes from plain rows encoded by FastJSONResponse (orjson when installed)
+    # instead of validating every item against the response model. Opt-in: the items carry
+    # the same fields, but in table column order rather than the response model's
+    FAST_LIST_RESPONSES: bool = os.getenv("FAST_LIST_RESPONSES", "false").lower() == "true"
+
+    # Domain lookup cache used by the application write path
+    DOMAIN_CACHE_TTL_SECONDS: int = int(os.getenv("DOMAIN_CACHE_TTL_SECONDS", "60"))
+    DOMAIN_CACHE_MAX_SIZE: int = int(os.getenv("DOMAIN_CACHE_MAX_SIZE", "1024"))
+
+    # Cached COUNT(*) results behind the `total` of list envelopes
+    COUNT_CACHE_TTL_SECONDS: int = int(os.getenv("COUNT_CACHE_TTL_SECONDS", "30"))
+    COUNT_CACHE_MAX_SIZE: int = int(os.getenv("COUNT_CACHE_MAX_SIZE", "4096"))
+
+    # Transactional outbox relay; every worker may run one, a PostgreSQL advisory lock lets
+    # only one publish at a time so events keep their per-key order
+    OUTBOX_RELAY_ENABLED: bool = os.getenv("OUTBOX_RELAY_ENABLED", "true").lower() == "true"
+    OUTBOX_RELAY_BATCH_SIZE: int = int(os.getenv("OUTBOX_RELAY_BATCH_SIZE", "100"))
+    OUTBOX_RELAY_POLL_INTERVAL_SECONDS: float = float(os.getenv("OUTBOX_RELAY_POLL_INTERVAL_SECONDS", "1.0"))
+
     # Kafka settings
     KAFKA_BOOTSTRAP_SERVERS: str = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
     KAFKA_CONSUMER_GROUP: str = os.getenv("KAFKA_CONSUMER_GROUP", "admin-service")
+    # Producer backend: "aiokafka" for a real broker, "memory" for the in-process fake broker,
+    # "mock" to only log messages
+    KAFKA_PRODUCER_BACKEND: str = os.getenv("KAFKA_PRODUCER_BACKEND", "mock")
+    KAFKA_LINGER_MS: int = int(os.getenv("KAFKA_LINGER_MS", "5"))
+    KAFKA_MAX_BATCH_SIZE: int = int(os.getenv("KAFKA_MAX_BATCH_SIZE", "65536"))
+    KAFKA_COMPRESSION_TYPE: Optional[str] = os.getenv("KAFKA_COMPRESSION_TYPE", "gzip") or None
+    KAFKA_ENABLE_IDEMPOTENCE: bool = os.getenv("KAFKA_ENABLE_IDEMPOTENCE", "true").lower() == "true"
+    KAFKA_MAX_IN_FLIGHT: int = int(os.getenv("KAFKA_MAX_IN_FLIGHT", "10000"))
+    KAFKA_REQUEST_TIMEOUT_MS: int = int(os.getenv("KAFKA_REQUEST_TIMEOUT_MS", "40000"))
+    # Consumer backend, same choices as the producer backend
+    KAFKA_CONSUMER_BACKEND: str = os.getenv("KAFKA_CONSUMER_BACKEND", "mock")
+    KAFKA_CONSUMER_MAX_CONCURRENCY: int = int(os.getenv("KAFKA_CONSUMER_MAX_CONCURRENCY", "32"))
+    KAFKA_CONSUMER_MAX_PENDING: int = int(os.getenv("KAFKA_CONSUMER_MAX_PENDING", "1000"))
+    KAFKA_CONSUMER_MAX_RECORDS: int = int(os.getenv("KAFKA_CONSUMER_MAX_RECORDS", "500"))
+    # Run the domain and application event consumers inside the API process
+    KAFKA_CONSUMERS_ENABLED: bool = os.getenv("KAFKA_CONSUMERS_ENABLED", "true").lower() == "true"
+
+    # Drain on SIGTERM: /health returns 503 and requests are still served for the delay, so
+    # load balancers stop routing here, then in-flight requests get up to the timeout before
+    # the server shuts down. Keep delay + timeout below the orchestrator's grace period
+    # (Kubernetes terminationGracePeriodSeconds, 30s by default).
+    SHUTDOWN_DRAIN_DELAY_SECONDS: float = float(os.getenv("SHUTDOWN_DRAIN_DELAY_SECONDS", "5"))
+    SHUTDOWN_DRAIN_TIMEOUT_SECONDS: float = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT_SECONDS", "20"))
     
     # Authentication settings
     AUTH_SERVICE_URL: str = os.getenv("AUTH_SERVICE_URL", "http://auth-service:8000")
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "supersecretkey")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # "local" verifies the JWT signature here, "remote" asks the auth service
+    AUTH_VALIDATION_MODE: str = os.getenv("AUTH_VALIDATION_MODE", "local")
+    AUTH_VALIDATE_PATH: str = os.getenv("AUTH_VALIDATE_PATH", "/api/v1/auth/validate")
+    AUTH_SERVICE_TIMEOUT_SECONDS: float = float(os.getenv("AUTH_SERVICE_TIMEOUT_SECONDS", "5"))
+    TOKEN_CACHE_MAX_SIZE: int = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
     
     class Config:
         case_sensitive = True
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import signal
+import threading
+from typing import Callable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+class InFlightRequests:
+    """Counts HTTP requests being handled so shutdown can wait for them"""
+
+    def __init__(self):
+        self.count = 0
+        self.draining = False
+        self._idle: Optional[asyncio.Event] = None
+
+    def _idle_event(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            if self.count == 0:
+                self._idle.set()
+        return self._idle
+
+    def enter(self) -> None:
+        self.count += 1
+        self._idle_event().clear()
+
+    def exit(self) -> None:
+        self.count -= 1
+        if self.count == 0:
+            self._idle_event().set()
+
+    async def drain(self, delay: float, timeout: float) -> bool:
+        """
+        Stop reporting ready, keep serving for delay seconds, then wait up to timeout seconds
+        for in-flight requests to finish
+
+        The delay gives load balancers time to notice the failing readiness check and stop
+        sending requests here. Returns False if requests were still running when the timeout
+        expired.
+        """
+        self.draining = True
+        await asyncio.sleep(delay)
+        try:
+            await asyncio.wait_for(self._idle_event().wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+# Tracker shared by the middleware and the application lifespan
+in_flight_requests = InFlightRequests()
+
+def install_sigterm_drain(tracker: InFlightRequests, delay: float, timeout: float) -> Callable[[], None]:
+    """
+    Drain tracker on SIGTERM before the server starts shutting down
+
+    uvicorn stops accepting connections as soon as its SIGTERM handler runs, and runs the
+    lifespan shutdown only after the in-flight requests are done, so draining there is too
+    late. This wraps the SIGTERM handler the server installed (uvicorn installs it with
+    signal.signal before the lifespan startup) so the drain runs first and the signal is
+    handed to the server afterwards. A second SIGTERM hands it over at once.
+
+    Must be called from the event loop of the main thread; elsewhere it does nothing.
+    Returns a function restoring the previous handler.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+    loop = asyncio.get_running_loop()
+    previous = signal.getsignal(signal.SIGTERM)
+    drain_task: Optional[asyncio.Task] = None
+    handed_over = False
+
+    def hand_over() -> None:
+        nonlocal handed_over
+        if handed_over:
+            return
+        handed_over = True
+        if callable(previous):
+            previous(signal.SIGTERM, None)
+        else:
+            # No Python handler to chain to: restore the default action and re-raise
+            signal.signal(signal.SIGTERM, previous if previous is not None else signal.SIG_DFL)
+            signal.raise_signal(signal.SIGTERM)
+
+    async def drain_then_hand_over() -> None:
+        logger.info(f"SIGTERM received, draining for {delay}s before shutting down")
+        if not await tracker.drain(delay, timeout):
+            logger.warning(f"Shutting down with {tracker.count} requests still in flight")
+        hand_over()
+
+    def start_drain() -> None:
+        nonlocal drain_task
+        if drain_task is None:
+            drain_task = loop.create_task(drain_then_hand_over())
+        else:
+            drain_task.cancel()
+            hand_over()
+
+    def handle_sigterm(signum, frame) -> None:
+        # Runs between bytecodes of the main thread; wake the loop to do the work
+        loop.call_soon_threadsafe(start_drain)
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    def restore() -> None:
+        if signal.getsignal(signal.SIGTERM) is handle_sigterm:
+            signal.signal(signal.SIGTERM, previous if previous is not None else signal.SIG_DFL)
+
+    return restore
+
+class InFlightMiddleware:
+    """ASGI middleware registering every HTTP request with in_flight_requests"""
+
+    def __init__(self, app: ASGIApp, tracker: InFlightRequests = in_flight_requests):
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.tracker.enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.tracker.exit()
@@ -0,0 +1,153 @@
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+)
+# Labelled by method only: the route is not known until the app has routed the request
+HTTP_REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests currently being handled", ["method"])
+
+# Database
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time a request waited for a pooled database connection",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# Kafka
+KAFKA_PRODUCE_DURATION = Histogram(
+    "kafka_produce_duration_seconds", "Time from send to broker acknowledgement", ["topic"]
+)
+KAFKA_PRODUCE_ERRORS = Counter("kafka_produce_errors_total", "Messages the producer failed to deliver", ["topic"])
+KAFKA_CONSUMER_LAG = Gauge(
+    "kafka_consumer_lag", "Messages between the last processed offset and the high watermark", ["topic", "partition"]
+)
+KAFKA_HANDLER_DURATION = Histogram(
+    "kafka_handler_duration_seconds", "Event handler latency", ["topic", "event_type"]
+)
+KAFKA_HANDLER_ERRORS = Counter("kafka_handler_errors_total", "Event handlers that raised", ["topic", "event_type"])
+
+UNMATCHED_ROUTE = "unmatched"
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording latency and in-flight requests per route template
+
+    Routes are labelled by their path template (e.g. /api/v1/domains/get_domain/{domain_id}),
+    so ids do not create new series; requests matching no route share one label. The template
+    is read from the route the router stored in the scope, so no matching is repeated here.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Full path template per (endpoint, mount path), built once per endpoint
+        self._templates: Dict[Tuple[Any, str], str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router records the matched route and endpoint on the shared scope
+            HTTP_REQUEST_DURATION.labels(method, self._route_template(scope), str(status_code)).observe(
+                time.perf_counter() - started
+            )
+            in_progress.dec()
+
+    def _route_template(self, scope: Scope) -> str:
+        route = scope.get("route")
+        path = getattr(route, "path", None)
+        if path is None:
+            return UNMATCHED_ROUTE
+        # Routes of a mounted app only know their path below the mount point
+        mount_path = scope.get("root_path", "")
+        key = (scope.get("endpoint", route), mount_path)
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = mount_path + path
+        return template
+
+class _PoolCollector:
+    """Reads connection pool gauges from SQLAlchemy engines at scrape time"""
+
+    def __init__(self, engines: Dict[str, Any]):
+        self.engines = engines
+
+    def collect(self):
+        size = GaugeMetricFamily("db_pool_size", "Configured number of pooled connections", labels=["engine"])
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections currently in use", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections opened beyond the pool size", labels=["engine"])
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            # NullPool and StaticPool keep no counters
+            if not hasattr(pool, "checkedout"):
+                continue
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield size
+        yield checked_out
+        yield overflow
+
+class _StatsCollector:
+    """Exports the numeric values of a stats() dict; keys ending in _total become counters"""
+
+    def __init__(self, prefix: str, stats: Callable[[], Dict[str, Any]]):
+        self.prefix = prefix
+        self.stats = stats
+
+    def collect(self):
+        for key, value in self.stats().items():
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            if key.endswith("_total"):
+                yield CounterMetricFamily(name, f"{self.prefix} {key}", value=value)
+            else:
+                yield GaugeMetricFamily(name, f"{self.prefix} {key}", value=value)
+
+def register_pool_collector(engines: Dict[str, Any]) -> None:
+    """
+    Export pool gauges for the given engines
+
+    Args:
+        engines: Sync Engine objects by label, e.g. {"sync": engine, "async": async_engine.sync_engine}
+    """
+    REGISTRY.register(_PoolCollector(engines))
+
+def register_stats_collector(prefix: str, stats: Callable[[], Dict[str, Any]]) -> None:
+    """
+    Export the counters returned by a component's stats function
+
+    Args:
+        prefix: The metric name prefix, e.g. "domain_cache"
+        stats: A function returning a flat dict of numbers
+    """
+    REGISTRY.register(_StatsCollector(prefix, stats))
+
+def render_metrics() -> bytes:
+    """Render every registered metric in the Prometheus text format"""
+    return generate_latest(REGISTRY)
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
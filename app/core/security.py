@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from jose import jwt, JWTError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+class InvalidTokenError(Exception):
+    """Raised when a token cannot be verified"""
+
+class AuthServiceUnavailableError(Exception):
+    """Raised when the auth service cannot be reached to validate a token"""
+
+# Verified claims keyed by a SHA-256 of the token, so raw tokens are never held in memory.
+# Each entry expires at the token's own `exp`; the cache-wide TTL only applies without one.
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# Remote validations in progress, shared by concurrent requests carrying the same token.
+# Each runs in its own task so a cancelled request does not fail the others waiting on it.
+_pending_validations: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+_auth_client: Optional[httpx.AsyncClient] = None
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _cache_claims(key: str, claims: Dict[str, Any]) -> None:
+    exp = claims.get("exp")
+    if exp is None:
+        token_cache.set(key, claims)
+        return
+    ttl = float(exp) - time.time()
+    if ttl > 0:
+        token_cache.set(key, claims, ttl=min(ttl, token_cache.ttl))
+
+def verify_token_local(token: str) -> Dict[str, Any]:
+    """
+    Verify the token signature and expiry with the shared secret
+
+    Raises InvalidTokenError if the token is not valid.
+    """
+    key = _token_key(token)
+    claims = token_cache.get(key)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        except JWTError as e:
+            raise InvalidTokenError(str(e))
+        _cache_claims(key, claims)
+    return claims
+
+def _get_auth_client() -> httpx.AsyncClient:
+    global _auth_client
+    if _auth_client is None:
+        _auth_client = httpx.AsyncClient(
+            base_url=settings.AUTH_SERVICE_URL, timeout=settings.AUTH_SERVICE_TIMEOUT_SECONDS
+        )
+    return _auth_client
+
+async def close_auth_client() -> None:
+    """Close the auth service HTTP client, called on application shutdown"""
+    global _auth_client
+    for pending in list(_pending_validations.values()):
+        pending.cancel()
+    if _auth_client is not None:
+        client, _auth_client = _auth_client, None
+        await client.aclose()
+
+async def _validate_remote(token: str) -> Dict[str, Any]:
+    try:
+        response = await _get_auth_client().get(
+            settings.AUTH_VALIDATE_PATH, headers={"Authorization": f"Bearer {token}"}
+        )
+    except httpx.HTTPError as e:
+        raise AuthServiceUnavailableError(f"Auth service unavailable: {str(e)}")
+    if response.status_code >= 500:
+        raise AuthServiceUnavailableError(f"Auth service error ({response.status_code})")
+    if response.status_code != 200:
+        raise InvalidTokenError(f"Auth service rejected token ({response.status_code})")
+    try:
+        claims = response.json()
+    except ValueError:
+        claims = None
+    if not isinstance(claims, dict):
+        # e.g. an HTML error page from a proxy in front of the auth service
+        raise AuthServiceUnavailableError("Auth service returned an invalid validation response")
+    if "exp" not in claims:
+        # Fall back to the token's own expiry for the cache lifetime
+        try:
+            exp = jwt.get_unverified_claims(token).get("exp")
+        except JWTError:
+            exp = None
+        if exp is not None:
+            claims = {**claims, "exp": exp}
+    return claims
+
+async def _validate_and_cache(key: str, token: str) -> Dict[str, Any]:
+    try:
+        claims = await _validate_remote(token)
+        _cache_claims(key, claims)
+        return claims
+    finally:
+        _pending_validations.pop(key, None)
+
+def _retrieve_exception(task: "asyncio.Task[Dict[str, Any]]") -> None:
+    # Mark the exception as retrieved when every request waiting on it was cancelled
+    if not task.cancelled():
+        task.exception()
+
+async def verify_token_remote(token: str) -> Dict[str, Any]:
+    """
+    Validate the token against the auth service
+
+    Successful validations are cached until the token expires, and concurrent requests
+    with the same uncached token share a single call to the auth service.
+    Raises InvalidTokenError if the token is not valid, or AuthServiceUnavailableError
+    if the auth service could not be reached.
+    """
+    key = _token_key(token)
+    claims = token_cache.get(key)
+    if claims is not None:
+        return claims
+
+    pending = _pending_validations.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_validate_and_cache(key, token))
+        pending.add_done_callback(_retrieve_exception)
+        _pending_validations[key] = pending
+    return await asyncio.shield(pending)
+
+async def verify_token(token: str) -> Dict[str, Any]:
+    """Verify a token using the configured AUTH_VALIDATION_MODE"""
+    if settings.AUTH_VALIDATION_MODE == "remote":
+        return await verify_token_remote(token)
+    return verify_token_local(token)
@@ -1,102 +1,572 @@
+from collections import Counter
+from sqlalchemy import func, or_, select, tuple_, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, NoReturn, Optional, Tuple, Union
 
+from app.db.counts import count_rows, estimate_row_count, invalidate_counts
+from app.db.errors import FOREIGN_KEY_VIOLATION, violated_constraint
+from app.db.jsonb import json_contains
+from app.db.returning import (
+    delete_returning, insert_returning, insert_returning_or_reject, supports_returning, update_returning
+)
+from app.db.search import ranked_search
+from app.db.versioning import ExpectedVersions, matches_version, version_criterion
+from app.events.outbox import add_outbox_event
+from app.events.producers.application_created import APPLICATION_EVENTS_TOPIC, build_application_created_event
+from app.events.producers.applications_bulk_updated import (
+    BULK_UPDATED_EVENT_MAX_IDS, build_applications_bulk_updated_event
+)
 from app.models.application import Application
-from app.schemas.application import ApplicationCreate, ApplicationUpdate
-from app.crud.domain import get_domain_by_name
+from app.models.domain import Domain
+from app.schemas.application import ApplicationBulkChanges, ApplicationBulkFilter, ApplicationCreate, ApplicationUpdate
+from app.crud.domain import get_cached_domain_by_name
+from app.crud.domain_stats import apply_domain_stats_deltas, application_stats_deltas, stats_key
 
 def get_application(db: Session, application_id: int) -> Optional[Application]:
     """Get an application by ID"""
     return db.query(Application).filter(Application.id == application_id).first()
 
-def get_all_applications(db: Session, skip: int = 0, limit: int = 100) -> List[Application]:
-    """Get all applications with pagination"""
-    return db.query(Application).offset(skip).limit(limit).all()
+def _application_query(db: Session, as_rows: bool):
+    # Plain rows skip the identity map and attribute instrumentation; they carry the same
+    # fields as ApplicationResponse and can be serialized without model validation
+    return db.query(*Application.__table__.columns) if as_rows else db.query(Application)
+
+def get_all_applications(
+    db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, as_rows: bool = False
+) -> List[Union[Application, Row]]:
+    """
+    Get all applications ordered by id.
+    Pages by keyset when after_id is given, otherwise by the deprecated skip offset.
+    With as_rows plain rows are returned instead of model instances.
+    """
+    query = _application_query(db, as_rows).order_by(Application.id)
+    if after_id is not None:
+        return query.filter(Application.id > after_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 def fetch_applications_by_domain_name(
-    db: Session, domain_name: str, application_name: Optional[str] = None, skip: int = 0, limit: int = 100
-) -> List[Application]:
+    db: Session,
+    domain_name: str,
+    application_name: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    as_rows: bool = False,
+) -> List[Union[Application, Row]]:
     """
     Fetch applications by domain name with optional filtering by application name.
-    Supports pagination.
+    Ordered by (domain_name, id), which is served by ix_applications_domain_name_id.
+    Pages by keyset when after_id is given, otherwise by the deprecated skip offset.
+    With as_rows plain rows are returned instead of model instances.
     """
-    query = db.query(Application).filter(Application.domain_name == domain_name)
+    query = _application_query(db, as_rows).filter(Application.domain_name == domain_name)
     if application_name:
         query = query.filter(Application.application_name == application_name)
+    query = query.order_by(Application.domain_name, Application.id)
+    if after_id is not None:
+        return query.filter(Application.id > after_id).limit(limit).all()
     return query.offset(skip).limit(limit).all()
 
+def count_applications(
+    db: Session, domain_name: Optional[str] = None, approximate: bool = False
+) -> Tuple[int, bool]:
+    """
+    Count all applications, or those of one domain.
+    Approximate totals come from the planner statistics for the whole table on PostgreSQL,
+    otherwise from the count cache, which the writes below keep current for this process.
+    Returns (total, is_estimate).
+    """
+    if approximate and domain_name is None:
+        estimate = estimate_row_count(db, Application.__table__)
+        if estimate is not None:
+            return estimate, True
+    query = db.query(func.count(Application.id))
+    if domain_name is not None:
+        query = query.filter(Application.domain_name == domain_name)
+    return count_rows(("applications", domain_name), query, approximate=approximate)
+
+def invalidate_application_counts(*domain_names: str) -> None:
+    """Drop the cached application counts of the given domains and of the whole table"""
+    invalidate_counts(("applications", None), *(("applications", name) for name in domain_names))
+
+def search_applications(
+    db: Session,
+    q: str,
+    domain_name: Optional[str] = None,
+    limit: int = 20,
+    after: Optional[Tuple[float, int]] = None,
+) -> List[Tuple[Application, float]]:
+    """
+    Search applications by name, code or description, best matches first.
+    Returns (application, rank) pairs; pass the last pair's (rank, id) as after for the next page.
+    """
+    filters = [Application.domain_name == domain_name] if domain_name is not None else []
+    return ranked_search(
+        db,
+        Application,
+        Application.application_name,
+        Application.application_code,
+        Application.description,
+        q,
+        limit=limit,
+        after=after,
+        filters=filters,
+    )
 
+def filter_applications_by_config(
+    db: Session,
+    contains: Dict[str, Any],
+    domain_name: Optional[str] = None,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> List[Application]:
+    """
+    Get the applications whose config contains the given keys and values, ordered by id.
+    On PostgreSQL the match is config @> contains, served by ix_applications_config.
+    """
+    try:
+        criterion = json_contains(db, Application.config, contains)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    query = db.query(Application).filter(criterion)
+    if domain_name is not None:
+        query = query.filter(Application.domain_name == domain_name)
+    if after_id is not None:
+        query = query.filter(Application.id > after_id)
+    return query.order_by(Application.id).limit(limit).all()
 
+def _integrity_error(error: IntegrityError) -> Optional[HTTPException]:
+    """
+    The API error for a constraint violation of an application write, None for an unexpected one
+    """
+    constraint = violated_constraint(error)
+    if constraint == "ix_applications_application_code":
+        return HTTPException(status_code=400, detail="Application code already registered")
+    if constraint == "uq_applications_domain_name_application_name":
+        return HTTPException(status_code=400, detail="Application name already exists in this domain")
+    if constraint in ("applications_domain_name_fkey", FOREIGN_KEY_VIOLATION):
+        # The domain does not exist, or was deleted after it was looked up
+        return HTTPException(status_code=404, detail="Domain not found")
+    return None
 
+def _raise_integrity_error(db: Session, error: IntegrityError) -> NoReturn:
+    """
+    Roll back and raise the API error for a constraint violation of an application write
+    """
+    db.rollback()
+    raise _integrity_error(error) or error
 
-def create_application(db: Session, application: ApplicationCreate) -> Application:
-    """Create a new application"""
+def _flush_or_raise(db: Session) -> None:
+    """
+    Flush pending changes, mapping constraint violations to the API errors
+    """
+    try:
+        db.flush()
+    except IntegrityError as e:
+        _raise_integrity_error(db, e)
+
+def _add_application_created_event(db: Session, application: Any, domain_id: int) -> None:
+    add_outbox_event(
+        db,
+        topic=APPLICATION_EVENTS_TOPIC,
+        key=str(application.id),
+        event_data=build_application_created_event(
+            application_id=application.id, application_name=application.application_name, domain_id=domain_id
+        ),
+    )
+
+def create_application(db: Session, application: ApplicationCreate) -> Row:
+    """
+    Create a new application.
+    The row is written and read back with one INSERT ... RETURNING.
+    """
     # Check if domain exists
-    domain = get_domain_by_name(db, domain_name=application.domain_name)
+    domain = get_cached_domain_by_name(db, domain_name=application.domain_name)
     if not domain:
         raise HTTPException(status_code=404, detail="Domain not found")
 
-    # Check if application name already exists in this domain
-    existing_applications = fetch_applications_by_domain_name(
-        db, domain_name=application.domain_name
-    )
-    if any(app.application_name == application.application_name for app in existing_applications):
-        raise HTTPException(status_code=400, detail="Application name already exists in this domain")
-
-    # Create new application
-    db_application = Application(
-        application_name=application.application_name,
-        application_code=application.application_code,
-        description=application.description,
-        domain_name=application.domain_name,
-        config=application.config,
-        status=application.status,
-        action=application.action,
-    )
-    db.add(db_application)
+    # Create new application; name uniqueness within the domain is enforced by
+    # uq_applications_domain_name_application_name rather than checked up front
+    try:
+        db_application, = insert_returning(db, Application, [{
+            "application_name": application.application_name,
+            "application_code": application.application_code,
+            "description": application.description,
+            "domain_name": application.domain_name,
+            "config": application.config,
+            "status": application.status,
+            "action": application.action,
+        }])
+    except IntegrityError as e:
+        _raise_integrity_error(db, e)
+    apply_domain_stats_deltas(db, application_stats_deltas([db_application]))
+    # Published by the outbox relay once this transaction commits
+    _add_application_created_event(db, db_application, domain_id=domain.id)
     db.commit()
-    db.refresh(db_application)
+    invalidate_application_counts(db_application.domain_name)
     return db_application
 
-def update_application(db: Session, application_id: int, application: ApplicationUpdate) -> Application:
-    """Update an application"""
-    db_application = get_application(db, application_id=application_id)
-    if not db_application:
-        raise HTTPException(status_code=404, detail="Application not found")
-    
+def bulk_create_applications(
+    db: Session, applications: List[ApplicationCreate]
+) -> Tuple[List[Row], List[Dict[str, Any]]]:
+    """
+    Create many applications in a single transaction.
+    Domain existence is checked with one query and code/name uniqueness with another for
+    the whole batch; the accepted items are written with one multi-row INSERT ... RETURNING.
+    Returns the created rows and the per-item errors as {"index", "detail"} dicts.
+    """
+    domain_ids = {
+        row.domain_name: row.id
+        for row in db.query(Domain.id, Domain.domain_name).filter(
+            Domain.domain_name.in_({app.domain_name for app in applications})
+        )
+    }
+    existing = db.query(Application.application_code, Application.domain_name, Application.application_name).filter(
+        or_(
+            Application.application_code.in_({app.application_code for app in applications}),
+            tuple_(Application.domain_name, Application.application_name).in_(
+                {(app.domain_name, app.application_name) for app in applications}
+            ),
+        )
+    ).all()
+    taken_codes = {row.application_code for row in existing}
+    taken_names = {(row.domain_name, row.application_name) for row in existing}
+
+    errors: List[Dict[str, Any]] = []
+    accepted: List[Tuple[int, Dict[str, Any]]] = []
+    batch_codes, batch_names = set(), set()
+    for index, app in enumerate(applications):
+        name_key = (app.domain_name, app.application_name)
+        if app.domain_name not in domain_ids:
+            errors.append({"index": index, "detail": "Domain not found"})
+        elif name_key in taken_names:
+            errors.append({"index": index, "detail": "Application name already exists in this domain"})
+        elif app.application_code in taken_codes:
+            errors.append({"index": index, "detail": "Application code already registered"})
+        elif app.application_code in batch_codes or name_key in batch_names:
+            errors.append({"index": index, "detail": "Duplicate application code or name in batch"})
+        else:
+            batch_codes.add(app.application_code)
+            batch_names.add(name_key)
+            accepted.append((index, {
+                "application_name": app.application_name,
+                "application_code": app.application_code,
+                "description": app.description,
+                "domain_name": app.domain_name,
+                "config": app.config,
+                "status": app.status,
+                "action": app.action,
+            }))
+
+    created, failures = insert_returning_or_reject(
+        db, Application, [values for _, values in accepted], on_conflict_do_nothing=True
+    )
+    # Items rejected by a constraint ON CONFLICT does not cover, e.g. a concurrent write
+    # that broke a foreign key, fail on their own
+    rejected = set()
+    for position, error in failures.items():
+        http_error = _integrity_error(error)
+        if http_error is None:
+            _raise_integrity_error(db, error)
+        index = accepted[position][0]
+        errors.append({"index": index, "detail": http_error.detail})
+        rejected.add(index)
+    for row in created:
+        _add_application_created_event(db, row, domain_id=domain_ids[row.domain_name])
+    apply_domain_stats_deltas(db, application_stats_deltas(created))
+    db.commit()
+    invalidate_application_counts(*{row.domain_name for row in created})
+
+    # Items skipped by ON CONFLICT DO NOTHING lost a race with a concurrent write
+    created_codes = {row.application_code for row in created}
+    for index, values in accepted:
+        if values["application_code"] not in created_codes and index not in rejected:
+            errors.append({"index": index, "detail": "Application code or name already registered"})
+    errors.sort(key=lambda error: error["index"])
+    return created, errors
+
+def _commit_application_update(db: Session, old_domain_name: str, old_stats_key: Tuple, updated: Any) -> None:
+    # Move the application between summary rows if its domain, status or action changed
+    new_stats_key = stats_key(updated.domain_name, updated.status, updated.action)
+    if new_stats_key != old_stats_key:
+        apply_domain_stats_deltas(db, {old_stats_key: -1, new_stats_key: 1})
+    db.commit()
+    if updated.domain_name != old_domain_name:
+        invalidate_application_counts(old_domain_name, updated.domain_name)
+
+def update_application(
+    db: Session,
+    application_id: int,
+    application: ApplicationUpdate,
+    expected_versions: Optional[ExpectedVersions] = None,
+) -> Union[Application, Row]:
+    """
+    Update an application.
+    With RETURNING support the change is one UPDATE ... WHERE id = :id RETURNING, which also
+    reads the previous domain, status and action for the stats. The expected versions are
+    part of its WHERE clause, so when no row comes back the application is either missing
+    (404) or was modified since the client read it (412).
+    The domain and the name uniqueness are enforced by the constraints.
+    """
     update_data = application.dict(exclude_unset=True)
-    
-    # Check if the domain exists when being updated
-    if "domain_name" in update_data:
-        domain = get_domain_by_name(db, domain_name=update_data["domain_name"])
-        if not domain:
-            raise HTTPException(status_code=404, detail="Domain not found")
-    
-    # Check for unique application name within the domain if being updated
-    if "application_name" in update_data and update_data["application_name"] != db_application.application_name:
-        domain_name = update_data.get("domain_name", db_application.domain_name)
-        if fetch_applications_by_domain_name(
-            db, domain_name=domain_name, application_name=update_data["application_name"]
-        ):
-            raise HTTPException(status_code=400, detail="Application name already exists in this domain")
-    
-    # Update the application fields
-    for key, value in update_data.items():
-        setattr(db_application, key, value)
-    
-    db.add(db_application)
+    if not update_data or not supports_returning(db):
+        db_application = get_application(db, application_id=application_id)
+        if not db_application:
+            raise HTTPException(status_code=404, detail="Application not found")
+        if not matches_version(db_application, expected_versions):
+            raise HTTPException(status_code=412, detail="Resource has been modified")
+        if not update_data:
+            return db_application
+        old_domain_name = db_application.domain_name
+        old_stats_key = stats_key(db_application.domain_name, db_application.status, db_application.action)
+        for key, value in update_data.items():
+            setattr(db_application, key, value)
+        _flush_or_raise(db)
+        _commit_application_update(db, old_domain_name, old_stats_key, db_application)
+        db.refresh(db_application)
+        return db_application
+
+    criteria = [Application.id == application_id]
+    precondition = version_criterion(Application, expected_versions)
+    if precondition is not None:
+        criteria.append(precondition)
+    try:
+        rows = update_returning(
+            db, Application, criteria, update_data, old_columns=("domain_name", "status", "action")
+        )
+    except IntegrityError as e:
+        _raise_integrity_error(db, e)
+    if not rows:
+        if precondition is not None and get_application(db, application_id=application_id) is not None:
+            raise HTTPException(status_code=412, detail="Resource has been modified")
+        raise HTTPException(status_code=404, detail="Application not found")
+    row = rows[0]
+    old_stats_key = stats_key(row.old_domain_name, row.old_status, row.old_action)
+    _commit_application_update(db, row.old_domain_name, old_stats_key, row)
+    return row
+
+def bulk_update_applications(
+    db: Session,
+    changes: ApplicationBulkChanges,
+    ids: Optional[List[int]] = None,
+    domain_name: Optional[str] = None,
+    filter: Optional[ApplicationBulkFilter] = None,
+    limit: int = 1000,
+    after_id: Optional[int] = None,
+) -> List[int]:
+    """
+    Apply the same changes to many applications with one UPDATE.
+    The applications are selected by ids or by domain_name, narrowed by the status and
+    action of filter. A domain is updated in id order, at most limit applications after
+    after_id at a time, so one request never locks an unbounded number of rows.
+    The domain stats are adjusted and applications_bulk_updated events are staged per domain.
+    Returns the ids of the updated applications.
+    """
+    if (ids is None) == (domain_name is None):
+        raise HTTPException(status_code=400, detail="Select the applications by either ids or domain_name")
+    values = changes.dict(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="No changes given")
+
+    table = Application.__table__
+    criteria = [table.c.id.in_(ids)] if ids is not None else [table.c.domain_name == domain_name]
+    filter_values = filter.dict(exclude_none=True) if filter is not None else {}
+    criteria.extend(table.c[key] == value for key, value in filter_values.items())
+    if domain_name is not None:
+        if after_id is not None:
+            criteria.append(table.c.id > after_id)
+        # The outer criteria are kept so a row changed since the subquery ran is re-checked
+        criteria.append(table.c.id.in_(select(table.c.id).where(*criteria).order_by(table.c.id).limit(limit)))
+
+    if supports_returning(db):
+        # Also returns the values the stats were counted under
+        rows = [
+            (row.id, row.domain_name, row.old_status, row.old_action, row.status, row.action)
+            for row in update_returning(db, Application, criteria, values, old_columns=("status", "action"))
+        ]
+    else:
+        selected = db.execute(
+            select(table.c.id, table.c.domain_name, table.c.status, table.c.action).where(*criteria).order_by(table.c.id)
+        ).all()
+        if selected:
+            db.execute(update(table).where(table.c.id.in_([row.id for row in selected])).values(**values))
+        rows = [
+            (
+                row.id, row.domain_name, row.status, row.action,
+                values.get("status", row.status), values.get("action", row.action),
+            )
+            for row in selected
+        ]
+
+    deltas: Counter = Counter()
+    ids_by_domain: Dict[str, List[int]] = {}
+    for row_id, row_domain_name, old_status, old_action, new_status, new_action in rows:
+        deltas[stats_key(row_domain_name, old_status, old_action)] -= 1
+        deltas[stats_key(row_domain_name, new_status, new_action)] += 1
+        ids_by_domain.setdefault(row_domain_name, []).append(row_id)
+    apply_domain_stats_deltas(db, deltas)
+
+    # Keyed by domain, so the events of one domain stay in order on one partition
+    for row_domain_name, domain_ids in sorted(ids_by_domain.items()):
+        domain_ids.sort()
+        for start in range(0, len(domain_ids), BULK_UPDATED_EVENT_MAX_IDS):
+            add_outbox_event(
+                db,
+                topic=APPLICATION_EVENTS_TOPIC,
+                key=row_domain_name,
+                event_data=build_applications_bulk_updated_event(
+                    application_ids=domain_ids[start:start + BULK_UPDATED_EVENT_MAX_IDS],
+                    changes=values,
+                    domain_name=row_domain_name,
+                ),
+            )
     db.commit()
-    db.refresh(db_application)
-    return db_application
+    return sorted(row[0] for row in rows)
 
 
 def delete_application(db: Session, application_id: int) -> None:
-    """Delete an application"""
-    db_application = get_application(db, application_id=application_id)
-    if not db_application:
+    """
+    Delete an application.
+    One DELETE ... RETURNING removes the row and reads the values its stats were counted under.
+    """
+    deleted = delete_returning(
+        db, Application, [Application.id == application_id], columns=("domain_name", "status", "action")
+    )
+    if not deleted:
         raise HTTPException(status_code=404, detail="Application not found")
     
-    db.delete(db_application)
+    apply_domain_stats_deltas(db, application_stats_deltas(deleted, delta=-1))
     db.commit()
+    invalidate_application_counts(deleted[0].domain_name)
     return None
+
+
+# Async versions used by the API routes, see app/crud/domain.py
+
+async def get_application_async(db: AsyncSession, application_id: int) -> Optional[Application]:
+    """Get an application by ID"""
+    return await db.run_sync(get_application, application_id=application_id)
+
+async def get_all_applications_async(
+    db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, as_rows: bool = False
+) -> List[Union[Application, Row]]:
+    """Get all applications ordered by id"""
+    return await db.run_sync(get_all_applications, skip=skip, limit=limit, after_id=after_id, as_rows=as_rows)
+
+async def fetch_applications_by_domain_name_async(
+    db: AsyncSession,
+    domain_name: str,
+    application_name: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    as_rows: bool = False,
+) -> List[Union[Application, Row]]:
+    """Fetch applications by domain name with optional filtering by application name"""
+    return await db.run_sync(
+        fetch_applications_by_domain_name,
+        domain_name=domain_name,
+        application_name=application_name,
+        skip=skip,
+        limit=limit,
+        after_id=after_id,
+        as_rows=as_rows,
+    )
+
+async def count_applications_async(
+    db: AsyncSession, domain_name: Optional[str] = None, approximate: bool = False
+) -> Tuple[int, bool]:
+    """Count all applications, or those of one domain"""
+    return await db.run_sync(count_applications, domain_name=domain_name, approximate=approximate)
+
+async def search_applications_async(
+    db: AsyncSession,
+    q: str,
+    domain_name: Optional[str] = None,
+    limit: int = 20,
+    after: Optional[Tuple[float, int]] = None,
+) -> List[Tuple[Application, float]]:
+    """Search applications by name, code or description, best matches first"""
+    return await db.run_sync(search_applications, q=q, domain_name=domain_name, limit=limit, after=after)
+
+async def filter_applications_by_config_async(
+    db: AsyncSession,
+    contains: Dict[str, Any],
+    domain_name: Optional[str] = None,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+) -> List[Application]:
+    """Get the applications whose config contains the given keys and values"""
+    return await db.run_sync(
+        filter_applications_by_config, contains=contains, domain_name=domain_name, limit=limit, after_id=after_id
+    )
+
+async def create_application_async(db: AsyncSession, application: ApplicationCreate) -> Row:
+    """Create a new application"""
+    return await db.run_sync(create_application, application=application)
+
+async def bulk_create_applications_async(
+    db: AsyncSession, applications: List[ApplicationCreate]
+) -> Tuple[List[Row], List[Dict[str, Any]]]:
+    """Create many applications in a single transaction"""
+    return await db.run_sync(bulk_create_applications, applications=applications)
+
+async def update_application_async(
+    db: AsyncSession,
+    application_id: int,
+    application: ApplicationUpdate,
+    expected_versions: Optional[ExpectedVersions] = None,
+) -> Union[Application, Row]:
+    """Update an application, if it is still one of the expected versions"""
+    return await db.run_sync(
+        update_application,
+        application_id=application_id,
+        application=application,
+        expected_versions=expected_versions,
+    )
+
+async def bulk_update_applications_async(
+    db: AsyncSession,
+    changes: ApplicationBulkChanges,
+    ids: Optional[List[int]] = None,
+    domain_name: Optional[str] = None,
+    filter: Optional[ApplicationBulkFilter] = None,
+    limit: int = 1000,
+    after_id: Optional[int] = None,
+) -> List[int]:
+    """Apply the same changes to many applications with one UPDATE"""
+    return await db.run_sync(
+        bulk_update_applications,
+        changes=changes,
+        ids=ids,
+        domain_name=domain_name,
+        filter=filter,
+        limit=limit,
+        after_id=after_id,
+    )
+
+async def delete_application_async(db: AsyncSession, application_id: int) -> None:
+    """Delete an application"""
+    return await db.run_sync(delete_application, application_id=application_id)
+
+async def stream_applications_async(
+    db: AsyncSession, domain_name: Optional[str] = None, status: Optional[bool] = None, batch_size: int = 1000
+) -> AsyncIterator[List[Row]]:
+    """
+    Stream applications ordered by id in batches of plain rows.
+    Uses a server-side cursor and skips the ORM identity map, so memory stays bounded
+    by batch_size regardless of table size.
+    """
+    table = Application.__table__
+    stmt = select(*table.columns).order_by(table.c.id)
+    if domain_name is not None:
+        stmt = stmt.where(table.c.domain_name == domain_name)
+    if status is not None:
+        stmt = stmt.where(table.c.status == status)
+    result = await db.stream(stmt.execution_options(max_row_buffer=batch_size))
+    async for rows in result.partitions(batch_size):
+        yield rows
@@ -1,13 +1,68 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, or_
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException
-from typing import List, Optional
+from typing import Any, Dict, List, NoReturn, Optional, Tuple, Union
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud.domain_stats import delete_domain_stats
+from app.db.counts import count_rows, estimate_row_count, invalidate_counts
+from app.db.errors import FOREIGN_KEY_VIOLATION, violated_constraint
+from app.db.returning import (
+    delete_returning, insert_returning, insert_returning_or_reject, supports_returning, update_returning
+)
+from app.db.search import ranked_search
+from app.db.versioning import ExpectedVersions, matches_version, version_criterion
+from app.events.outbox import add_outbox_event
+from app.events.producers.domain_created import DOMAIN_EVENTS_TOPIC, build_domain_created_event
 from app.models.domain import Domain
 from app.schemas.domain import DomainCreate, DomainUpdate
 
-def get_domain(db: Session, domain_id: int) -> Optional[Domain]:
-    """Get a domain by ID"""
-    return db.query(Domain).filter(Domain.id == domain_id).first()
+# Process-local cache of domain rows, keyed by ("name", domain_name) and ("code", domain_code).
+# Only existing domains are cached, so a domain created by another worker is seen on the next
+# lookup; the TTL bounds how long another worker's update or delete can go unnoticed here.
+domain_cache = TTLCache(maxsize=settings.DOMAIN_CACHE_MAX_SIZE, ttl=settings.DOMAIN_CACHE_TTL_SECONDS)
+
+def _get_cached_domain(db: Session, kind: str, column, value: str) -> Optional[Row]:
+    row = domain_cache.get((kind, value))
+    if row is None:
+        row = db.query(*Domain.__table__.columns).filter(column == value).first()
+        if row is not None:
+            domain_cache.set(("name", row.domain_name), row)
+            domain_cache.set(("code", row.domain_code), row)
+    return row
+
+def get_cached_domain_by_name(db: Session, domain_name: str) -> Optional[Row]:
+    """Get a read-only domain row by name, served from the domain cache when possible"""
+    return _get_cached_domain(db, "name", Domain.domain_name, domain_name)
+
+def get_cached_domain_by_code(db: Session, domain_code: str) -> Optional[Row]:
+    """Get a read-only domain row by code, served from the domain cache when possible"""
+    return _get_cached_domain(db, "code", Domain.domain_code, domain_code)
+
+def invalidate_domain_cache(domain_name: Optional[str] = None, domain_code: Optional[str] = None) -> None:
+    """Drop the cached rows for a domain name and/or code"""
+    if domain_name is not None:
+        domain_cache.invalidate(("name", domain_name))
+    if domain_code is not None:
+        domain_cache.invalidate(("code", domain_code))
+
+def get_domain_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss counters of the domain cache"""
+    return domain_cache.stats()
+
+def get_domain(db: Session, domain_id: int, include_applications: bool = False) -> Optional[Domain]:
+    """
+    Get a domain by ID.
+    With include_applications the applications are loaded by one extra SELECT ... IN query.
+    """
+    query = db.query(Domain)
+    if include_applications:
+        query = query.options(selectinload(Domain.applications))
+    return query.filter(Domain.id == domain_id).first()
 
 def get_domain_by_code(db: Session, domain_code: str) -> Optional[Domain]:
     """Get a domain by code"""
@@ -17,66 +72,296 @@ def get_domain_by_name(db: Session, domain_name: str) -> Optional[Domain]:
     """Get a domain by name"""
     return db.query(Domain).filter(Domain.domain_name == domain_name).first()
 
-def get_domains(db: Session, skip: int = 0, limit: int = 100) -> List[Domain]:
-    """Get all domains with pagination"""
-    return db.query(Domain).offset(skip).limit(limit).all()
+def get_domains(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    include_applications: bool = False,
+    as_rows: bool = False,
+) -> List[Union[Domain, Row]]:
+    """
+    Get all domains ordered by id.
+    Pages by keyset when after_id is given, otherwise by the deprecated skip offset.
+    With include_applications the applications of the whole page are loaded by one extra
+    SELECT ... IN query, so a page always costs two queries.
+    With as_rows plain rows carrying the DomainResponse fields are returned instead of
+    model instances; it cannot be combined with include_applications.
+    """
+    if as_rows:
+        query = db.query(*Domain.__table__.columns).order_by(Domain.id)
+    else:
+        query = db.query(Domain).order_by(Domain.id)
+    if include_applications:
+        query = query.options(selectinload(Domain.applications))
+    if after_id is not None:
+        return query.filter(Domain.id > after_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
-def create_domain(db: Session, domain: DomainCreate) -> Domain:
-    """Create a new domain"""
-    # Check if domain code already exists
-    db_domain = get_domain_by_code(db, domain_code=domain.domain_code)
-    if db_domain:
-        raise HTTPException(status_code=400, detail="Domain code already registered")
-    
-    # Check if domain name already exists
-    if get_domain_by_name(db, domain_name=domain.domain_name):
-        raise HTTPException(status_code=400, detail="Domain name already registered")
-    
-    # Create new domain
-    db_domain = Domain(
-        domain_name=domain.domain_name,
-        domain_code=domain.domain_code,
-        description=domain.description,
-        status=domain.status,
-        action=domain.action
+def count_domains(db: Session, approximate: bool = False) -> Tuple[int, bool]:
+    """
+    Count all domains.
+    Approximate totals come from the planner statistics on PostgreSQL, otherwise from the count cache.
+    Returns (total, is_estimate).
+    """
+    if approximate:
+        estimate = estimate_row_count(db, Domain.__table__)
+        if estimate is not None:
+            return estimate, True
+    return count_rows(("domains", None), db.query(func.count(Domain.id)), approximate=approximate)
+
+def search_domains(
+    db: Session, q: str, limit: int = 20, after: Optional[Tuple[float, int]] = None
+) -> List[Tuple[Domain, float]]:
+    """
+    Search domains by name, code or description, best matches first.
+    Returns (domain, rank) pairs; pass the last pair's (rank, id) as after for the next page.
+    """
+    return ranked_search(
+        db, Domain, Domain.domain_name, Domain.domain_code, Domain.description, q, limit=limit, after=after
     )
-    db.add(db_domain)
+
+def _add_domain_created_event(db: Session, domain: Any) -> None:
+    add_outbox_event(
+        db,
+        topic=DOMAIN_EVENTS_TOPIC,
+        key=str(domain.id),
+        event_data=build_domain_created_event(domain_id=domain.id, domain_name=domain.domain_name),
+    )
+
+def _integrity_error(error: IntegrityError) -> Optional[HTTPException]:
+    """
+    The API error for a constraint violation of a domain write, None for an unexpected one
+    """
+    constraint = violated_constraint(error)
+    if constraint == "ix_domains_domain_code":
+        return HTTPException(status_code=400, detail="Domain code already registered")
+    if constraint == "ix_domains_domain_name":
+        return HTTPException(status_code=400, detail="Domain name already registered")
+    if constraint in ("applications_domain_name_fkey", FOREIGN_KEY_VIOLATION):
+        # applications.domain_name references the old name
+        return HTTPException(status_code=400, detail="Domain has applications and cannot be renamed")
+    return None
+
+def _raise_integrity_error(db: Session, error: IntegrityError) -> NoReturn:
+    """
+    Roll back and raise the API error for a constraint violation of a domain write
+    """
+    db.rollback()
+    raise _integrity_error(error) or error
+
+def create_domain(db: Session, domain: DomainCreate) -> Row:
+    """
+    Create a new domain.
+    The row is written and read back with one INSERT ... RETURNING; code and name
+    uniqueness are enforced by the unique constraints rather than checked up front.
+    """
+    try:
+        db_domain, = insert_returning(db, Domain, [{
+            "domain_name": domain.domain_name,
+            "domain_code": domain.domain_code,
+            "description": domain.description,
+            "status": domain.status,
+            "action": domain.action,
+        }])
+    except IntegrityError as e:
+        _raise_integrity_error(db, e)
+    # Published by the outbox relay once this transaction commits
+    _add_domain_created_event(db, db_domain)
     db.commit()
-    db.refresh(db_domain)
+    invalidate_counts(("domains", None))
     return db_domain
 
-def update_domain(db: Session, domain_id: int, domain: DomainUpdate) -> Domain:
-    """Update a domain"""
-    db_domain = get_domain(db, domain_id=domain_id)
-    if not db_domain:
-        raise HTTPException(status_code=404, detail="Domain not found")
-    
-    update_data = domain.dict(exclude_unset=True)
-    
-    # Check code uniqueness if being updated
-    if "domain_code" in update_data and update_data["domain_code"] != db_domain.domain_code:
-        if get_domain_by_code(db, domain_code=update_data["domain_code"]):
-            raise HTTPException(status_code=400, detail="Domain code already registered")
-    
-    # Check name uniqueness if being updated
-    if "domain_name" in update_data and update_data["domain_name"] != db_domain.domain_name:
-        if get_domain_by_name(db, domain_name=update_data["domain_name"]):
-            raise HTTPException(status_code=400, detail="Domain name already registered")
-    
-    for key, value in update_data.items():
-        setattr(db_domain, key, value)
-    
-    db.add(db_domain)
+def bulk_create_domains(db: Session, domains: List[DomainCreate]) -> Tuple[List[Row], List[Dict[str, Any]]]:
+    """
+    Create many domains in a single transaction.
+    The whole batch is checked for existing codes and names with one query and the
+    accepted items are written with one multi-row INSERT ... RETURNING.
+    Returns the created rows and the per-item errors as {"index", "detail"} dicts.
+    """
+    existing = db.query(Domain.domain_code, Domain.domain_name).filter(
+        or_(
+            Domain.domain_code.in_({domain.domain_code for domain in domains}),
+            Domain.domain_name.in_({domain.domain_name for domain in domains}),
+        )
+    ).all()
+    taken_codes = {row.domain_code for row in existing}
+    taken_names = {row.domain_name for row in existing}
+
+    errors: List[Dict[str, Any]] = []
+    accepted: List[Tuple[int, Dict[str, Any]]] = []
+    batch_codes, batch_names = set(), set()
+    for index, domain in enumerate(domains):
+        if domain.domain_code in taken_codes:
+            errors.append({"index": index, "detail": "Domain code already registered"})
+        elif domain.domain_name in taken_names:
+            errors.append({"index": index, "detail": "Domain name already registered"})
+        elif domain.domain_code in batch_codes or domain.domain_name in batch_names:
+            errors.append({"index": index, "detail": "Duplicate domain code or name in batch"})
+        else:
+            batch_codes.add(domain.domain_code)
+            batch_names.add(domain.domain_name)
+            accepted.append((index, {
+                "domain_name": domain.domain_name,
+                "domain_code": domain.domain_code,
+                "description": domain.description,
+                "status": domain.status,
+                "action": domain.action,
+            }))
+
+    created, failures = insert_returning_or_reject(
+        db, Domain, [values for _, values in accepted], on_conflict_do_nothing=True
+    )
+    # Items rejected by a constraint ON CONFLICT does not cover, e.g. a concurrent write
+    # that broke a foreign key, fail on their own
+    rejected = set()
+    for position, error in failures.items():
+        http_error = _integrity_error(error)
+        if http_error is None:
+            _raise_integrity_error(db, error)
+        index = accepted[position][0]
+        errors.append({"index": index, "detail": http_error.detail})
+        rejected.add(index)
+    for row in created:
+        _add_domain_created_event(db, row)
     db.commit()
-    db.refresh(db_domain)
-    return db_domain
+    invalidate_counts(("domains", None))
+
+    # Items skipped by ON CONFLICT DO NOTHING lost a race with a concurrent write
+    created_codes = {row.domain_code for row in created}
+    for index, values in accepted:
+        if values["domain_code"] not in created_codes and index not in rejected:
+            errors.append({"index": index, "detail": "Domain code or name already registered"})
+    errors.sort(key=lambda error: error["index"])
+    return created, errors
+
+def update_domain(
+    db: Session, domain_id: int, domain: DomainUpdate, expected_versions: Optional[ExpectedVersions] = None
+) -> Union[Domain, Row]:
+    """
+    Update a domain.
+    With RETURNING support the change is one UPDATE ... WHERE id = :id RETURNING, which also
+    reads the previous name and code for the cache. The expected versions are part of its
+    WHERE clause, so when no row comes back the domain is either missing (404) or was
+    modified since the client read it (412).
+    Code and name uniqueness are enforced by the unique constraints.
+    """
+    update_data = domain.dict(exclude_unset=True)
+    if not update_data or not supports_returning(db):
+        db_domain = get_domain(db, domain_id=domain_id)
+        if not db_domain:
+            raise HTTPException(status_code=404, detail="Domain not found")
+        if not matches_version(db_domain, expected_versions):
+            raise HTTPException(status_code=412, detail="Resource has been modified")
+        if not update_data:
+            return db_domain
+        old_name, old_code = db_domain.domain_name, db_domain.domain_code
+        for key, value in update_data.items():
+            setattr(db_domain, key, value)
+        try:
+            db.commit()
+        except IntegrityError as e:
+            _raise_integrity_error(db, e)
+        invalidate_domain_cache(domain_name=old_name, domain_code=old_code)
+        invalidate_domain_cache(domain_name=db_domain.domain_name, domain_code=db_domain.domain_code)
+        db.refresh(db_domain)
+        return db_domain
+
+    criteria = [Domain.id == domain_id]
+    precondition = version_criterion(Domain, expected_versions)
+    if precondition is not None:
+        criteria.append(precondition)
+    try:
+        rows = update_returning(db, Domain, criteria, update_data, old_columns=("domain_name", "domain_code"))
+        db.commit()
+    except IntegrityError as e:
+        _raise_integrity_error(db, e)
+    if not rows:
+        if precondition is not None and get_domain(db, domain_id=domain_id) is not None:
+            raise HTTPException(status_code=412, detail="Resource has been modified")
+        raise HTTPException(status_code=404, detail="Domain not found")
+    row = rows[0]
+    invalidate_domain_cache(domain_name=row.old_domain_name, domain_code=row.old_domain_code)
+    invalidate_domain_cache(domain_name=row.domain_name, domain_code=row.domain_code)
+    return row
 
 def delete_domain(db: Session, domain_id: int) -> None:
-    """Delete a domain"""
-    db_domain = get_domain(db, domain_id=domain_id)
-    if not db_domain:
+    """
+    Delete a domain and its applications.
+    Runs a single DELETE on domains; the applications are removed by the database through
+    ON DELETE CASCADE, so none of them are loaded however large the domain is.
+    """
+    deleted = delete_returning(db, Domain, [Domain.id == domain_id], columns=("domain_name", "domain_code"))
+    if not deleted:
         raise HTTPException(status_code=404, detail="Domain not found")
     
-    db.delete(db_domain)
+    db_domain = deleted[0]
+    delete_domain_stats(db, db_domain.domain_name)
     db.commit()
+    invalidate_domain_cache(domain_name=db_domain.domain_name, domain_code=db_domain.domain_code)
+    # The domain's applications went with it
+    invalidate_counts(("domains", None), ("applications", None), ("applications", db_domain.domain_name))
     return None
+
+
+# Async versions used by the API routes. Each one runs the sync implementation above on the
+# AsyncSession's connection via ``run_sync``, so the queries go through the async driver
+# without duplicating the business rules.
+
+async def get_domain_async(db: AsyncSession, domain_id: int, include_applications: bool = False) -> Optional[Domain]:
+    """Get a domain by ID"""
+    return await db.run_sync(get_domain, domain_id=domain_id, include_applications=include_applications)
+
+async def get_domain_by_code_async(db: AsyncSession, domain_code: str) -> Optional[Domain]:
+    """Get a domain by code"""
+    return await db.run_sync(get_domain_by_code, domain_code=domain_code)
+
+async def get_domain_by_name_async(db: AsyncSession, domain_name: str) -> Optional[Domain]:
+    """Get a domain by name"""
+    return await db.run_sync(get_domain_by_name, domain_name=domain_name)
+
+async def get_domains_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    include_applications: bool = False,
+    as_rows: bool = False,
+) -> List[Union[Domain, Row]]:
+    """Get all domains ordered by id"""
+    return await db.run_sync(
+        get_domains, skip=skip, limit=limit, after_id=after_id,
+        include_applications=include_applications, as_rows=as_rows,
+    )
+
+async def count_domains_async(db: AsyncSession, approximate: bool = False) -> Tuple[int, bool]:
+    """Count all domains"""
+    return await db.run_sync(count_domains, approximate=approximate)
+
+async def search_domains_async(
+    db: AsyncSession, q: str, limit: int = 20, after: Optional[Tuple[float, int]] = None
+) -> List[Tuple[Domain, float]]:
+    """Search domains by name, code or description, best matches first"""
+    return await db.run_sync(search_domains, q=q, limit=limit, after=after)
+
+async def create_domain_async(db: AsyncSession, domain: DomainCreate) -> Row:
+    """Create a new domain"""
+    return await db.run_sync(create_domain, domain=domain)
+
+async def bulk_create_domains_async(
+    db: AsyncSession, domains: List[DomainCreate]
+) -> Tuple[List[Row], List[Dict[str, Any]]]:
+    """Create many domains in a single transaction"""
+    return await db.run_sync(bulk_create_domains, domains=domains)
+
+async def update_domain_async(
+    db: AsyncSession, domain_id: int, domain: DomainUpdate, expected_versions: Optional[ExpectedVersions] = None
+) -> Union[Domain, Row]:
+    """Update a domain, if it is still one of the expected versions"""
+    return await db.run_sync(
+        update_domain, domain_id=domain_id, domain=domain, expected_versions=expected_versions
+    )
+
+async def delete_domain_async(db: AsyncSession, domain_id: int) -> None:
+    """Delete a domain"""
+    return await db.run_sync(delete_domain, domain_id=domain_id)
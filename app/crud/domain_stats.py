@@ -0,0 +1,149 @@
+"""
+Per-domain application counts kept in the domain_application_stats summary table.
+
+The application writes call apply_domain_stats_deltas in their own transaction, so reads
+cost one row per (domain, status, action) instead of a scan of the applications.
+Rebuild the table from the applications if it ever drifts:
+
+    python -m app.crud.domain_stats
+"""
+import argparse
+import json
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.application import Application
+from app.models.domain import Domain
+from app.models.domain_application_stats import DomainApplicationStats
+
+StatsKey = Tuple[str, bool, str]
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def stats_key(domain_name: str, status: Optional[bool], action: Optional[str]) -> StatsKey:
+    """The summary row an application with these values is counted in"""
+    return domain_name, bool(status), action or ""
+
+def application_stats_deltas(applications: Iterable[Any], delta: int = 1) -> Counter:
+    """
+    Count changes for creating (delta=1) or deleting (delta=-1) the given applications
+
+    Args:
+        applications: Models or rows with domain_name, status and action
+        delta: The change per application
+    """
+    deltas: Counter = Counter()
+    for application in applications:
+        deltas[stats_key(application.domain_name, application.status, application.action)] += delta
+    return deltas
+
+def apply_domain_stats_deltas(db: Session, deltas: Dict[StatsKey, int]) -> None:
+    """
+    Add count changes to the summary table with one upsert; the caller owns the transaction
+
+    Keys are written in sorted order, so concurrent writers lock the rows in the same order.
+    """
+    rows = [
+        {"domain_name": domain_name, "status": status, "action": action, "application_count": delta}
+        for (domain_name, status, action), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    table = DomainApplicationStats.__table__
+    stmt = _UPSERT_INSERTS[db.get_bind().dialect.name](table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.domain_name, table.c.status, table.c.action],
+        set_={"application_count": table.c.application_count + stmt.excluded.application_count},
+    )
+    db.execute(stmt)
+
+def delete_domain_stats(db: Session, domain_name: str) -> None:
+    """Drop the summary rows of a deleted domain"""
+    db.query(DomainApplicationStats).filter(DomainApplicationStats.domain_name == domain_name).delete(
+        synchronize_session=False
+    )
+
+def get_domain_stats(db: Session, domain_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Get application counts per domain, split by status and action, ordered by domain name.
+    Domains without applications are included with zero counts.
+    """
+    stats = DomainApplicationStats
+    query = (
+        db.query(Domain.domain_name, stats.status, stats.action, stats.application_count)
+        .outerjoin(stats, and_(stats.domain_name == Domain.domain_name, stats.application_count > 0))
+        .order_by(Domain.domain_name, stats.status.desc(), stats.action)
+    )
+    if domain_name is not None:
+        query = query.filter(Domain.domain_name == domain_name)
+
+    domains: Dict[str, Dict[str, Any]] = {}
+    for row in query:
+        entry = domains.setdefault(row.domain_name, {
+            "domain_name": row.domain_name,
+            "application_count": 0,
+            "active_count": 0,
+            "inactive_count": 0,
+            "breakdown": [],
+        })
+        if row.application_count is None:
+            continue
+        entry["application_count"] += row.application_count
+        entry["active_count" if row.status else "inactive_count"] += row.application_count
+        entry["breakdown"].append({
+            "status": row.status, "action": row.action or None, "application_count": row.application_count
+        })
+    return list(domains.values())
+
+def rebuild_domain_stats(db: Session) -> Dict[str, int]:
+    """
+    Recompute the summary table from the applications and commit
+
+    On PostgreSQL the table is locked against concurrent deltas for the duration, so
+    writes that land during the rebuild are neither lost nor counted twice.
+    Returns the number of rows written and of (domain, status, action) keys that had drifted.
+    """
+    table = DomainApplicationStats.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE domain_application_stats IN EXCLUSIVE MODE"))
+    before = {
+        (row.domain_name, row.status, row.action): row.application_count
+        for row in db.execute(select(table)) if row.application_count
+    }
+    db.execute(table.delete())
+    counted = select(
+        Application.domain_name,
+        func.coalesce(Application.status, False),
+        func.coalesce(Application.action, ""),
+        func.count(),
+    ).group_by(Application.domain_name, func.coalesce(Application.status, False), func.coalesce(Application.action, ""))
+    db.execute(insert(table).from_select(["domain_name", "status", "action", "application_count"], counted))
+    after = {
+        (row.domain_name, row.status, row.action): row.application_count for row in db.execute(select(table))
+    }
+    db.commit()
+    drifted = sum(1 for key in before.keys() | after.keys() if before.get(key) != after.get(key))
+    return {"rows": len(after), "drifted": drifted}
+
+async def get_domain_stats_async(db: AsyncSession, domain_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get application counts per domain, split by status and action"""
+    return await db.run_sync(get_domain_stats, domain_name=domain_name)
+
+def main() -> None:
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(json.dumps(rebuild_domain_stats(db)))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="Rebuild domain_application_stats from the applications table").parse_args()
+    main()
@@ -1,4 +1,13 @@
+from sqlalchemy import DDL, event
+
 # Import all the models, so that Base has them before being imported by Alembic
 from app.db.session import Base
 from app.models.domain import Domain
-from app.models.application import Application
\ No newline at end of file
+from app.models.application import Application
+from app.models.domain_application_stats import DomainApplicationStats
+from app.models.outbox import OutboxEvent
+
+# The trigram search indexes need pg_trgm; migration 006 installs it for migrated databases
+event.listen(
+    Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
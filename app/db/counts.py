@@ -0,0 +1,62 @@
+from typing import Any, Hashable, Optional, Tuple
+
+from sqlalchemy import Table, text
+from sqlalchemy.orm import Query, Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Process-local cache of COUNT(*) results, keyed by (table name, filter value), e.g.
+# ("applications", "billing") or ("applications", None) for the whole table. The CRUD
+# writes invalidate the keys they affect; the TTL bounds how long a write made by another
+# worker can go unnoticed here.
+count_cache = TTLCache(maxsize=settings.COUNT_CACHE_MAX_SIZE, ttl=settings.COUNT_CACHE_TTL_SECONDS)
+
+# The planner's own estimate: rows per page at the last ANALYZE scaled to the current size
+_ESTIMATE_SQL = text(
+    """
+    SELECT CASE
+        WHEN c.reltuples < 0 OR c.relpages = 0 THEN NULL
+        ELSE (c.reltuples / c.relpages * (pg_relation_size(c.oid) / current_setting('block_size')::int))::bigint
+    END
+    FROM pg_class c
+    WHERE c.oid = CAST(:table AS regclass)
+    """
+)
+
+
+def estimate_row_count(db: Session, table: Table) -> Optional[int]:
+    """
+    Estimate the rows of a table from the PostgreSQL statistics, without scanning it
+
+    Returns None on other dialects and for tables that have never been analyzed.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    return db.execute(_ESTIMATE_SQL, {"table": table.name}).scalar()
+
+
+def count_rows(key: Hashable, query: Query, approximate: bool = False) -> Tuple[int, bool]:
+    """
+    Run a COUNT query, or serve its last result from count_cache
+
+    Args:
+        key: The count_cache key of the query
+        query: A query selecting a single count
+        approximate: Accept a cached result instead of counting now
+
+    Returns (total, is_estimate); cached totals are reported as estimates.
+    """
+    if approximate:
+        cached = count_cache.get(key)
+        if cached is not None:
+            return cached, True
+    total = query.scalar() or 0
+    count_cache.set(key, total)
+    return total, False
+
+
+def invalidate_counts(*keys: Any) -> None:
+    """Drop the cached counts for the given keys"""
+    for key in keys:
+        count_cache.invalidate(key)
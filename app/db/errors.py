@@ -0,0 +1,54 @@
+import re
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.db.session import Base
+
+# Reported for SQLite foreign key violations, which do not name the constraint
+FOREIGN_KEY_VIOLATION = "FOREIGN KEY"
+
+_SQLITE_UNIQUE = re.compile(r"UNIQUE constraint failed: (.+)")
+
+
+def _sqlite_unique_constraint(columns: str) -> Optional[str]:
+    # "applications.domain_name, applications.application_name" -> the unique constraint
+    # or index declared on exactly those columns
+    qualified = [column.strip().split(".", 1) for column in columns.split(",")]
+    table = Base.metadata.tables.get(qualified[0][0])
+    if table is None:
+        return None
+    names = {column for _, column in qualified}
+    for index in table.indexes:
+        if index.unique and {column.name for column in index.columns} == names:
+            return index.name
+    for constraint in table.constraints:
+        if getattr(constraint, "columns", None) is not None and {column.name for column in constraint.columns} == names:
+            return constraint.name
+    return None
+
+
+def violated_constraint(error: IntegrityError) -> Optional[str]:
+    """
+    Name the constraint whose violation raised an IntegrityError
+
+    PostgreSQL reports the name with the error (psycopg2's diag, asyncpg's constraint_name).
+    SQLite only reports the columns of a unique violation, which are resolved against the
+    model metadata, and nothing about a foreign key violation, which is returned as
+    FOREIGN_KEY_VIOLATION. Returns None when the constraint cannot be determined.
+    """
+    orig = error.orig
+    diag = getattr(orig, "diag", None)
+    if diag is not None:
+        return diag.constraint_name
+    # The asyncpg adapter raises its DBAPI error from the original asyncpg exception
+    cause = getattr(orig, "__cause__", None)
+    if getattr(cause, "constraint_name", None) is not None:
+        return cause.constraint_name
+    message = str(orig)
+    if message.startswith("FOREIGN KEY constraint failed"):
+        return FOREIGN_KEY_VIOLATION
+    match = _SQLITE_UNIQUE.match(message)
+    if match is not None:
+        return _sqlite_unique_constraint(match.group(1))
+    return None
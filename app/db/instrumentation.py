@@ -0,0 +1,127 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+
+class QueryStats:
+    """Statements executed and time spent in the database on behalf of one request"""
+
+    __slots__ = ("path", "count", "seconds")
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.count = 0
+        self.seconds = 0.0
+
+# Stats of the request being handled. The object is mutated in place, so statements run in
+# greenlets spawned by AsyncSession (which copy the context) still count for the request.
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+def get_query_stats() -> Optional[QueryStats]:
+    """Get the stats of the current request, if it is being instrumented"""
+    return _current_stats.get()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|:\w+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce a statement to its shape so that executions differing only in values group together
+
+    Literals and driver placeholders become ?, IN lists and multi-row VALUES collapse to one entry.
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _VALUES_LIST.sub(r"\1, ...", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        normalized = normalize_sql(statement)
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(elapsed * 1000, 3),
+            "threshold_ms": settings.DB_SLOW_QUERY_MS,
+            "fingerprint": hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12],
+            "statement": normalized,
+            "executemany": executemany,
+            "path": stats.path if stats is not None else None,
+        }))
+
+def _handle_error(exception_context) -> None:
+    # after_cursor_execute does not run for failed statements
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count statements and database time per request and log slow statements
+
+    Args:
+        engine: A sync Engine, or the sync_engine of an AsyncEngine
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware collecting QueryStats for each request
+
+    Adds X-DB-Query-Count and X-DB-Time-Ms to the response. Headers are sent before a
+    streamed body, so statements run while streaming are not included.
+    """
+
+    def __init__(self, app: ASGIApp, headers: bool = True):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(path=scope.get("path"))
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and self.headers:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (QUERY_COUNT_HEADER.lower().encode("latin-1"), str(stats.count).encode("latin-1")),
+                    (QUERY_TIME_HEADER.lower().encode("latin-1"), f"{stats.seconds * 1000:.3f}".encode("latin-1")),
+                ]
+            await send(message)
+
+        token = _current_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
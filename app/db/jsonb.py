@@ -0,0 +1,45 @@
+import json
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import and_, func, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+
+def _flatten(value: Dict[str, Any], path: str = "$") -> Iterator[Tuple[str, Any]]:
+    for key, item in value.items():
+        item_path = f"{path}.{json.dumps(str(key))}"
+        if isinstance(item, dict) and item:
+            yield from _flatten(item, item_path)
+        elif isinstance(item, (list, dict)):
+            raise ValueError("Array and empty object values need PostgreSQL containment")
+        else:
+            yield item_path, item
+
+
+def json_contains(db: Session, column: Any, value: Dict[str, Any]) -> Any:
+    """
+    WHERE criterion matching rows whose JSON column contains value
+
+    On PostgreSQL this is the jsonb @> operator, served by a GIN index on the column.
+    Other dialects (the SQLite stand-in used locally) compare each scalar leaf of value
+    with json_extract, which covers nested objects but not arrays.
+
+    Args:
+        db: The database session, used to pick the dialect
+        column: A JSON/JSONB column
+        value: The object the column must contain, e.g. {"features": {"x": true}}
+
+    Raises ValueError if value cannot be matched on the current dialect.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # The column is declared JSON with a JSONB variant; coerce so @> is used
+        return type_coerce(column, JSONB).contains(value)
+    criteria: List[Any] = []
+    for path, leaf in _flatten(value):
+        if leaf is None:
+            # json_extract returns NULL for a missing key as well as for a JSON null
+            criteria.append(func.json_type(column, path) == "null")
+        else:
+            criteria.append(func.json_extract(column, path) == leaf)
+    return and_(True, *criteria)
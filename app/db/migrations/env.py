@@ -7,8 +7,8 @@ from sqlalchemy import pool
 
 from alembic import context
 
-# Add the parent directory to sys.path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
+# Add the service root (the directory holding the app package) to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
 # Import the Base object and models
 from app.db.base import Base
@@ -22,22 +22,25 @@ def upgrade():
     op.create_table(
         'domains',
         sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('domain_name', sa.String(length=100), nullable=False),
+        sa.Column('domain_code', sa.String(length=50), nullable=False),
         sa.Column('description', sa.Text(), nullable=True),
-        sa.Column('config', sa.Text(), nullable=True),
-        sa.Column('is_active', sa.Boolean(), nullable=True, default=True),
+        sa.Column('status', sa.Boolean(), nullable=True),
+        sa.Column('action', sa.Text(), nullable=True),
         sa.Column('created_at', sa.DateTime(timezone=True), server_default=func.now(), nullable=True),
-        sa.Column('updated_at', sa.DateTime(timezone=True), onupdate=func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
     # Create indexes
     op.create_index(op.f('ix_domains_id'), 'domains', ['id'], unique=False)
-    op.create_index(op.f('ix_domains_name'), 'domains', ['name'], unique=True)
+    op.create_index(op.f('ix_domains_domain_name'), 'domains', ['domain_name'], unique=True)
+    op.create_index(op.f('ix_domains_domain_code'), 'domains', ['domain_code'], unique=True)
 
 
 def downgrade():
     # Drop indexes
-    op.drop_index(op.f('ix_domains_name'), table_name='domains')
+    op.drop_index(op.f('ix_domains_domain_code'), table_name='domains')
+    op.drop_index(op.f('ix_domains_domain_name'), table_name='domains')
     op.drop_index(op.f('ix_domains_id'), table_name='domains')
     # Drop table
-    op.drop_table('domains')
\ No newline at end of file
+    op.drop_table('domains')
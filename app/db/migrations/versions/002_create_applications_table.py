@@ -22,27 +22,29 @@ def upgrade():
     op.create_table(
         'applications',
         sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('application_name', sa.String(length=100), nullable=False),
+        sa.Column('application_code', sa.String(length=50), nullable=False),
         sa.Column('description', sa.Text(), nullable=True),
-        sa.Column('domain_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Boolean(), nullable=True),
+        sa.Column('action', sa.String(length=50), nullable=True),
+        sa.Column('domain_name', sa.String(length=100), nullable=False),
         sa.Column('config', sa.Text(), nullable=True),
-        sa.Column('api_key', sa.String(length=100), nullable=True),
-        sa.Column('is_active', sa.Boolean(), nullable=True, default=True),
         sa.Column('created_at', sa.DateTime(timezone=True), server_default=func.now(), nullable=True),
-        sa.Column('updated_at', sa.DateTime(timezone=True), onupdate=func.now(), nullable=True),
-        sa.ForeignKeyConstraint(['domain_id'], ['domains.id'], ),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        # Named like PostgreSQL names it for create_all, so later revisions can alter it
+        sa.ForeignKeyConstraint(['domain_name'], ['domains.domain_name'], name='applications_domain_name_fkey'),
         sa.PrimaryKeyConstraint('id')
     )
     # Create indexes
     op.create_index(op.f('ix_applications_id'), 'applications', ['id'], unique=False)
-    op.create_index(op.f('ix_applications_name'), 'applications', ['name'], unique=False)
-    op.create_index(op.f('ix_applications_api_key'), 'applications', ['api_key'], unique=True)
+    op.create_index(op.f('ix_applications_application_name'), 'applications', ['application_name'], unique=False)
+    op.create_index(op.f('ix_applications_application_code'), 'applications', ['application_code'], unique=True)
 
 
 def downgrade():
     # Drop indexes
-    op.drop_index(op.f('ix_applications_api_key'), table_name='applications')
-    op.drop_index(op.f('ix_applications_name'), table_name='applications')
+    op.drop_index(op.f('ix_applications_application_code'), table_name='applications')
+    op.drop_index(op.f('ix_applications_application_name'), table_name='applications')
     op.drop_index(op.f('ix_applications_id'), table_name='applications')
     # Drop table
-    op.drop_table('applications')
\ No newline at end of file
+    op.drop_table('applications')
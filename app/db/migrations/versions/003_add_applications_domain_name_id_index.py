@@ -0,0 +1,24 @@
+"""add applications (domain_name, id) index
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pagination of applications within a domain orders by (domain_name, id)
+    op.create_index('ix_applications_domain_name_id', 'applications', ['domain_name', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_applications_domain_name_id', table_name='applications')
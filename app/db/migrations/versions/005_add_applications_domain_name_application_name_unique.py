@@ -0,0 +1,52 @@
+"""add unique (domain_name, application_name) constraint on applications
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+# Duplicate pairs listed in the error when the constraint cannot be created
+MAX_LISTED_DUPLICATES = 50
+
+
+def upgrade():
+    # Application names are unique within a domain. Which of two same-named applications
+    # keeps its name is for an operator to decide, so existing duplicates stop the
+    # migration with the pairs to fix instead of being renamed here
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT domain_name, application_name, count(*) AS copies, min(id) AS first_id"
+        " FROM applications GROUP BY domain_name, application_name HAVING count(*) > 1"
+        " ORDER BY domain_name, application_name"
+    )).fetchall()
+    if duplicates:
+        listed = "\n".join(
+            f"  domain_name={row.domain_name!r} application_name={row.application_name!r}:"
+            f" {row.copies} applications, lowest id {row.first_id}"
+            for row in duplicates[:MAX_LISTED_DUPLICATES]
+        )
+        if len(duplicates) > MAX_LISTED_DUPLICATES:
+            listed += f"\n  ... and {len(duplicates) - MAX_LISTED_DUPLICATES} more"
+        raise RuntimeError(
+            f"Cannot add uq_applications_domain_name_application_name: {len(duplicates)}"
+            f" (domain_name, application_name) pairs are used by more than one application."
+            f" Rename or delete the duplicates and run the migration again:\n{listed}"
+        )
+    op.create_unique_constraint(
+        'uq_applications_domain_name_application_name',
+        'applications',
+        ['domain_name', 'application_name'],
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_applications_domain_name_application_name', 'applications', type_='unique')
@@ -0,0 +1,49 @@
+"""add pg_trgm indexes for domain and application search
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, column) of the trigram indexes behind /domains/search and /applications/search
+TRIGRAM_INDEXES = [
+    ('ix_domains_domain_name_trgm', 'domains', 'domain_name'),
+    ('ix_domains_domain_code_trgm', 'domains', 'domain_code'),
+    ('ix_domains_description_trgm', 'domains', 'description'),
+    ('ix_applications_application_name_trgm', 'applications', 'application_name'),
+    ('ix_applications_application_code_trgm', 'applications', 'application_code'),
+    ('ix_applications_description_trgm', 'applications', 'description'),
+]
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # A plain CREATE INDEX blocks writes to the table for the whole build; CONCURRENTLY
+    # does not, but cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                name,
+                table,
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    # pg_trgm is left installed, other objects may depend on it
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(TRIGRAM_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
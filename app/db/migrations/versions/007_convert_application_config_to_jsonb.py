@@ -0,0 +1,54 @@
+"""convert applications.config to jsonb with a GIN index
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Blank strings and JSON null become NULL. The API only accepts objects, so any other
+    # JSON value (array, string, number, boolean) is kept as {"value": <old value>} rather
+    # than failing response validation later. Text that is not valid JSON aborts the
+    # migration and must be fixed by hand first.
+    op.alter_column(
+        'applications',
+        'config',
+        type_=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using=(
+            "CASE"
+            " WHEN config IS NULL OR btrim(config) = '' THEN NULL"
+            " WHEN jsonb_typeof(config::jsonb) = 'object' THEN config::jsonb"
+            " WHEN jsonb_typeof(config::jsonb) = 'null' THEN NULL"
+            " ELSE jsonb_build_object('value', config::jsonb)"
+            " END"
+        ),
+    )
+    # jsonb_path_ops only supports @>, and is smaller and faster than the default opclass for it
+    op.create_index(
+        'ix_applications_config', 'applications', ['config'],
+        postgresql_using='gin', postgresql_ops={'config': 'jsonb_path_ops'},
+    )
+
+
+def downgrade():
+    op.drop_index('ix_applications_config', table_name='applications')
+    op.alter_column(
+        'applications',
+        'config',
+        type_=sa.Text(),
+        existing_nullable=True,
+        postgresql_using='config::text',
+    )
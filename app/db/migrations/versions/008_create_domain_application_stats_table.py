@@ -0,0 +1,41 @@
+"""create domain application stats table
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Application counts per (domain, status, action) behind /domains/stats, kept current by
+    # the application writes; no foreign key, so renaming a domain is not blocked by its rows
+    op.create_table(
+        'domain_application_stats',
+        sa.Column('domain_name', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.Boolean(), nullable=False),
+        sa.Column('action', sa.String(length=50), server_default='', nullable=False),
+        sa.Column('application_count', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('domain_name', 'status', 'action')
+    )
+    op.execute(
+        """
+        INSERT INTO domain_application_stats (domain_name, status, action, application_count)
+        SELECT domain_name, COALESCE(status, false), COALESCE(action, ''), count(*)
+        FROM applications
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade():
+    op.drop_table('domain_application_stats')
@@ -0,0 +1,31 @@
+"""delete applications with their domain via ON DELETE CASCADE
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Lets delete_domain remove a domain with one statement instead of loading its applications
+    op.drop_constraint('applications_domain_name_fkey', 'applications', type_='foreignkey')
+    op.create_foreign_key(
+        'applications_domain_name_fkey', 'applications', 'domains',
+        ['domain_name'], ['domain_name'], ondelete='CASCADE',
+    )
+
+
+def downgrade():
+    op.drop_constraint('applications_domain_name_fkey', 'applications', type_='foreignkey')
+    op.create_foreign_key(
+        'applications_domain_name_fkey', 'applications', 'domains', ['domain_name'], ['domain_name'],
+    )
@@ -0,0 +1,140 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+# INSERT constructs supporting ON CONFLICT DO NOTHING
+_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def supports_returning(db: Session) -> bool:
+    """Whether the session's dialect supports INSERT/UPDATE ... RETURNING"""
+    return bool(getattr(db.get_bind().dialect, "full_returning", False))
+
+
+def insert_returning(
+    db: Session, model: Any, rows: Sequence[Dict[str, Any]], on_conflict_do_nothing: bool = False
+) -> List[Row]:
+    """
+    Insert rows with a single multi-row INSERT ... RETURNING and return the inserted rows
+
+    Args:
+        db: The database session; the caller owns the transaction
+        model: The ORM model whose table is inserted into
+        rows: Column values for each new row
+        on_conflict_do_nothing: Skip rows that violate a unique constraint instead of
+            failing the whole statement (PostgreSQL and SQLite); skipped rows are not
+            returned. Other violations, such as a foreign key, still fail the statement.
+
+    Dialects without RETURNING (the SQLite stand-in used locally) fall back to one
+    INSERT per row followed by a SELECT of the new primary keys.
+    """
+    if not rows:
+        return []
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    if on_conflict_do_nothing and dialect not in _CONFLICT_INSERTS:
+        raise NotImplementedError(f"ON CONFLICT DO NOTHING is not supported on {dialect}")
+
+    def insert_stmt(values):
+        if on_conflict_do_nothing:
+            return _CONFLICT_INSERTS[dialect](table).values(values).on_conflict_do_nothing()
+        return insert(table).values(values)
+
+    if supports_returning(db):
+        return list(db.execute(insert_stmt(list(rows)).returning(*table.columns)))
+
+    ids = []
+    for row in rows:
+        result = db.execute(insert_stmt(row))
+        # A row skipped by ON CONFLICT DO NOTHING inserts nothing
+        if result.rowcount:
+            ids.append(result.inserted_primary_key[0])
+    if not ids:
+        return []
+    return list(db.execute(table.select().where(table.c.id.in_(ids)).order_by(table.c.id)))
+
+
+def insert_returning_or_reject(
+    db: Session, model: Any, rows: Sequence[Dict[str, Any]], on_conflict_do_nothing: bool = False
+) -> Tuple[List[Row], Dict[int, IntegrityError]]:
+    """
+    Insert rows like insert_returning, rejecting the rows that violate a constraint
+    instead of failing the whole batch
+
+    The rows are first written with one insert_returning inside a SAVEPOINT. If that
+    raises an IntegrityError, e.g. a foreign key violation ON CONFLICT does not cover,
+    they are inserted again one at a time, each in its own SAVEPOINT.
+
+    Returns the inserted rows and the IntegrityError of each rejected row, keyed by its
+    position in rows. Rows skipped by on_conflict_do_nothing are in neither.
+    """
+    try:
+        with db.begin_nested():
+            return insert_returning(db, model, rows, on_conflict_do_nothing=on_conflict_do_nothing), {}
+    except IntegrityError:
+        pass
+
+    created: List[Row] = []
+    rejected: Dict[int, IntegrityError] = {}
+    for position, row in enumerate(rows):
+        try:
+            with db.begin_nested():
+                created.extend(insert_returning(db, model, [row], on_conflict_do_nothing=on_conflict_do_nothing))
+        except IntegrityError as e:
+            rejected[position] = e
+    return created, rejected
+
+
+def update_returning(
+    db: Session, model: Any, criteria: Sequence[Any], values: Dict[str, Any], old_columns: Sequence[str] = ()
+) -> List[Row]:
+    """
+    Update the rows matching criteria with a single UPDATE ... RETURNING and return the updated rows
+
+    Needs a dialect with RETURNING, see supports_returning.
+
+    Args:
+        db: The database session; the caller owns the transaction
+        model: The ORM model whose table is updated
+        criteria: WHERE criteria selecting the rows
+        values: The new column values; onupdate defaults such as updated_at are applied too
+        old_columns: Columns whose values from before the update are returned as well,
+            labelled old_<name>; a FOR UPDATE CTE in the same statement reads them, locking
+            the rows in id order
+    """
+    table = model.__table__
+    stmt = update(table).values(**values)
+    if not old_columns:
+        return list(db.execute(stmt.where(*criteria).returning(*table.columns)))
+    old = select(table.c.id, *(table.c[name] for name in old_columns)).where(*criteria).order_by(table.c.id)
+    old = old.with_for_update().cte("old")
+    stmt = stmt.where(table.c.id == old.c.id).returning(
+        *table.columns, *(old.c[name].label(f"old_{name}") for name in old_columns)
+    )
+    return list(db.execute(stmt))
+
+
+def delete_returning(db: Session, model: Any, criteria: Sequence[Any], columns: Sequence[str]) -> List[Row]:
+    """
+    Delete the rows matching criteria with a single DELETE ... RETURNING and return their values
+
+    Args:
+        db: The database session; the caller owns the transaction
+        model: The ORM model whose table is deleted from
+        criteria: WHERE criteria selecting the rows
+        columns: The columns of the deleted rows to return
+
+    Dialects without RETURNING fall back to a SELECT of the rows followed by the DELETE.
+    """
+    table = model.__table__
+    returned = [table.c[name] for name in columns]
+    if supports_returning(db):
+        return list(db.execute(delete(table).where(*criteria).returning(*returned)))
+    rows = list(db.execute(select(*returned).where(*criteria)))
+    if rows:
+        db.execute(delete(table).where(*criteria))
+    return rows
@@ -0,0 +1,72 @@
+from typing import Any, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Float, and_, case, cast, func, literal, or_
+from sqlalchemy.orm import Session
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so the value matches literally (escape character is a backslash)"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _similarity(db: Session, column: Any, q: str) -> Any:
+    if db.get_bind().dialect.name == "postgresql":
+        # pg_trgm similarity, 0..1
+        return func.similarity(column, q)
+    # Stand-in for dialects without pg_trgm: the share of the value covered by the match
+    return literal(float(len(q))) / func.length(column)
+
+
+def ranked_search(
+    db: Session,
+    model: Any,
+    name_column: Any,
+    code_column: Any,
+    description_column: Any,
+    q: str,
+    limit: int = 20,
+    after: Optional[Tuple[float, int]] = None,
+    filters: Iterable[Any] = (),
+) -> List[Tuple[Any, float]]:
+    """
+    Substring search over a model's name, code and description, best matches first
+
+    Rows match when any of the three columns contains q (case-insensitive); on PostgreSQL
+    each ILIKE is served by the pg_trgm GIN indexes from migration 006, as long as q has
+    at least 3 characters (one trigram); shorter patterns scan the table. The rank favours
+    name and code prefix matches, then trigram similarity of name and code.
+    Results are ordered by (rank desc, id) and paged by keyset.
+
+    Args:
+        db: The database session
+        model: The ORM model to search
+        name_column, code_column, description_column: The searched columns of model
+        q: The search text
+        limit: The page size
+        after: The (rank, id) of the last row of the previous page
+        filters: Extra WHERE criteria, e.g. a domain restriction
+
+    Returns the matching model instances with their rank.
+    """
+    contains = f"%{escape_like(q)}%"
+    prefix = f"{escape_like(q)}%"
+    rank = cast(
+        case((name_column.ilike(prefix, escape="\\"), 2.0), else_=0.0)
+        + case((code_column.ilike(prefix, escape="\\"), 1.0), else_=0.0)
+        + _similarity(db, name_column, q)
+        + 0.5 * _similarity(db, code_column, q),
+        Float,
+    )
+    query = db.query(model, rank.label("rank")).filter(
+        or_(
+            name_column.ilike(contains, escape="\\"),
+            code_column.ilike(contains, escape="\\"),
+            description_column.ilike(contains, escape="\\"),
+        ),
+        *filters,
+    )
+    if after is not None:
+        after_rank, after_id = after
+        query = query.filter(or_(rank < after_rank, and_(rank == after_rank, model.id > after_id)))
+    return [(row[0], row.rank) for row in query.order_by(rank.desc(), model.id).limit(limit)]
+
@@ -1,18 +1,115 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+import time
+from typing import Any, AsyncGenerator, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT
+from app.db.instrumentation import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Build the pool options for an engine from the DB_* settings"""
+    if url.startswith("sqlite"):
+        # SQLite uses its own single-connection pools, which take no sizing options
+        return {}
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer in transaction mode hands each transaction a different server connection,
+        # so neither pooled connections nor prepared statements can be kept on this side
+        options: Dict[str, Any] = {"poolclass": NullPool}
+        if "+asyncpg" in url:
+            options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        return options
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if "+asyncpg" in url:
+        options["connect_args"] = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return options
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+# Sync (psycopg2) engine, kept as a fallback for scripts, Alembic and background jobs
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, **_engine_options(settings.SQLALCHEMY_DATABASE_URI))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async (asyncpg) engine used by the API routes so queries never block the event loop
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI, **_engine_options(settings.SQLALCHEMY_ASYNC_DATABASE_URI)
+)
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    # SQLite only enforces foreign keys, and with them ON DELETE CASCADE, when each
+    # connection asks for it
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+for _engine in (engine, async_engine.sync_engine):
+    if _engine.dialect.name == "sqlite":
+        event.listen(_engine, "connect", _enable_sqlite_foreign_keys)
+
+# Per-request statement counts and the slow-query log, see app/db/instrumentation.py
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
 Base = declarative_base()
 
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
     try:
+        # Check out the connection up front so the pool wait is measured on its own
+        started = time.perf_counter()
+        db.connection()
+        DB_POOL_CHECKOUT_WAIT.labels("sync").observe(time.perf_counter() - started)
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async DB session
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        await db.connection()
+        DB_POOL_CHECKOUT_WAIT.labels("async").observe(time.perf_counter() - started)
+        yield db
+
+async def prewarm_async_pool(connections: int = settings.DB_POOL_SIZE) -> int:
+    """
+    Open pooled connections ahead of the first requests and return how many were opened
+
+    Does nothing for pools that keep no connections (NullPool in pgbouncer mode, SQLite).
+    Failures are logged rather than raised, so a database that is still starting up does
+    not prevent the service from booting.
+    """
+    if connections <= 0 or not isinstance(async_engine.sync_engine.pool, QueuePool):
+        return 0
+    results = await asyncio.gather(
+        *(async_engine.connect() for _ in range(connections)), return_exceptions=True
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+    if len(opened) < connections:
+        error = next(conn for conn in results if isinstance(conn, BaseException))
+        logger.warning(f"Prewarmed {len(opened)} of {connections} database connections: {str(error)}")
+    else:
+        logger.info(f"Prewarmed {len(opened)} database connections")
+    return len(opened)
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, false, func, or_
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# (row id, row version) pairs a write is restricted to, e.g. parsed from an If-Match header
+ExpectedVersions = Sequence[Tuple[int, int]]
+
+
+def row_version(obj: Any) -> int:
+    """
+    The version of a domain or application row: microseconds since the epoch of its last write
+
+    Naive timestamps (SQLite) are taken as UTC. SQLite's CURRENT_TIMESTAMP only has second
+    precision, so two writes within the same second share a version there; PostgreSQL's
+    now() has microsecond precision.
+    """
+    stamp: Optional[datetime] = obj.updated_at or obj.created_at
+    if stamp is None:
+        return 0
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return (stamp - _EPOCH) // timedelta(microseconds=1)
+
+
+def matches_version(obj: Any, expected_versions: Optional[ExpectedVersions]) -> bool:
+    """Whether a loaded row is one of the expected versions; None accepts any version"""
+    return expected_versions is None or (obj.id, row_version(obj)) in expected_versions
+
+
+def version_criterion(model: Any, expected_versions: Optional[ExpectedVersions]) -> Optional[Any]:
+    """
+    Build a WHERE criterion restricting a write to the expected row versions
+
+    Adding it to an UPDATE or DELETE makes the version check and the write one atomic
+    statement: a row that changed since the client read it is simply not matched.
+
+    Args:
+        model: The domain or application model being written
+        expected_versions: The acceptable (id, version) pairs; an empty sequence matches nothing
+
+    Returns None when any version is acceptable.
+    """
+    if expected_versions is None:
+        return None
+    stamp = func.coalesce(model.updated_at, model.created_at)
+    versions = []
+    for row_id, version in expected_versions:
+        if version == 0:
+            versions.append(and_(model.id == row_id, stamp.is_(None)))
+        else:
+            versions.append(and_(model.id == row_id, stamp == _EPOCH + timedelta(microseconds=version)))
+    return or_(*versions) if versions else false()
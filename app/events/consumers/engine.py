@@ -0,0 +1,275 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Coroutine, Dict, Hashable, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import KAFKA_CONSUMER_LAG, KAFKA_HANDLER_DURATION, KAFKA_HANDLER_ERRORS
+from app.events.kafka_client import get_consumer
+
+logger = logging.getLogger(__name__)
+
+# Type for event handlers
+EventHandler = Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]
+
+class _PartitionWorker:
+    """Processes the batches fetched for one partition, one batch at a time"""
+
+    def __init__(self, engine: "EventConsumer", tp: Hashable):
+        self.engine = engine
+        self.tp = tp
+        self.pending = 0  # messages queued or being processed
+        self.processed_offset: Optional[int] = None  # next offset to commit
+        self.committed_offset: Optional[int] = None
+        self.first_offset: Optional[int] = None  # first offset fetched, for lag before any batch is done
+        self._queue: "asyncio.Queue[List[Any]]" = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    def submit(self, messages: List[Any]) -> None:
+        if self.first_offset is None:
+            self.first_offset = messages[0].offset
+        self.pending += len(messages)
+        self._queue.put_nowait(messages)
+
+    async def _run(self) -> None:
+        while True:
+            messages = await self._queue.get()
+            try:
+                await self.engine.process_batch(messages)
+            finally:
+                self.pending -= len(messages)
+            self.processed_offset = messages[-1].offset + 1
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+class EventConsumer:
+    """
+    Kafka consumer that processes partitions concurrently
+
+    - Each partition has its own worker, so a slow partition does not hold up the others.
+    - Within a fetched batch, messages with the same key run sequentially in offset order
+      and different keys run concurrently; batches of a partition run one after another.
+    - Handler concurrency across all partitions is capped by max_concurrency.
+    - Offsets are committed once per loop iteration for every partition that finished a
+      batch, instead of relying on auto-commit.
+    - A partition is paused once max_pending messages are waiting on it and resumed when
+      its worker has caught up.
+    - On a group rebalance the workers of revoked partitions are stopped and their finished
+      offsets committed before the partitions are released, so the new owner resumes there.
+    """
+
+    def __init__(
+        self,
+        topic: str,
+        max_concurrency: int = settings.KAFKA_CONSUMER_MAX_CONCURRENCY,
+        max_pending: int = settings.KAFKA_CONSUMER_MAX_PENDING,
+        max_records: int = settings.KAFKA_CONSUMER_MAX_RECORDS,
+    ):
+        self.topic = topic
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.max_records = max_records
+        self.handlers: Dict[str, EventHandler] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._workers: Dict[Hashable, _PartitionWorker] = {}
+        self._consumer: Optional[Any] = None
+
+    def register_handler(self, event_type: str, handler: EventHandler) -> None:
+        """
+        Register a handler function for a specific event type
+
+        Args:
+            event_type: The type of event to handle
+            handler: The async function that will handle the event
+        """
+        self.handlers[event_type] = handler
+        logger.info(f"Registered handler for event type: {event_type}")
+
+    async def process_event(self, event_data: Dict[str, Any]) -> None:
+        """
+        Process an event by routing it to the appropriate handler
+
+        Args:
+            event_data: The event data as a dictionary
+        """
+        event_type = event_data.get("event_type")
+        if not event_type:
+            logger.warning(f"Received event without event_type: {event_data}")
+            return
+
+        handler = self.handlers.get(event_type)
+        if not handler:
+            logger.warning(f"No handler registered for event type: {event_type}")
+            return
+
+        started = time.perf_counter()
+        try:
+            await handler(event_data)
+        except Exception as e:
+            KAFKA_HANDLER_ERRORS.labels(self.topic, event_type).inc()
+            logger.error(f"Error processing {event_type} event: {str(e)}")
+        finally:
+            KAFKA_HANDLER_DURATION.labels(self.topic, event_type).observe(time.perf_counter() - started)
+
+    async def process_message(self, message: Any) -> None:
+        """Decode a Kafka message and process it under the concurrency cap"""
+        try:
+            event_data = json.loads(message.value.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            logger.error(f"Failed to parse event as JSON: {message.value}")
+            return
+        async with self._semaphore:
+            await self.process_event(event_data)
+
+    async def process_batch(self, messages: List[Any]) -> None:
+        """Process a partition's batch, keeping per-key order"""
+        chains: "OrderedDict[Any, List[Any]]" = OrderedDict()
+        for message in messages:
+            chains.setdefault(message.key, []).append(message)
+        await asyncio.gather(*(self._process_chain(chain) for chain in chains.values()))
+
+    async def _process_chain(self, messages: List[Any]) -> None:
+        for message in messages:
+            try:
+                await self.process_message(message)
+            except Exception as e:
+                logger.error(f"Error processing message: {str(e)}")
+
+    def _assigned_workers(self, consumer: Any) -> Dict[Hashable, _PartitionWorker]:
+        assigned = consumer.assignment()
+        return {tp: worker for tp, worker in self._workers.items() if tp in assigned}
+
+    async def _commit(self, consumer: Any, workers: Dict[Hashable, _PartitionWorker]) -> None:
+        offsets = {
+            tp: worker.processed_offset
+            for tp, worker in workers.items()
+            if worker.processed_offset is not None and worker.processed_offset != worker.committed_offset
+        }
+        if not offsets:
+            return
+        try:
+            await consumer.commit(offsets)
+        except Exception as e:
+            # Uncommitted offsets are retried on the next iteration or replayed after a rebalance
+            logger.error(f"Error committing offsets for {self.topic}: {str(e)}")
+            return
+        for tp, offset in offsets.items():
+            workers[tp].committed_offset = offset
+
+    async def _drop_workers(self, partitions: Iterable[Hashable]) -> Dict[Hashable, _PartitionWorker]:
+        # Stop and forget the workers of the given partitions, returning them
+        dropped = {tp: self._workers.pop(tp) for tp in list(partitions) if tp in self._workers}
+        for tp, worker in dropped.items():
+            await worker.stop()
+            try:
+                KAFKA_CONSUMER_LAG.remove(self.topic, str(tp.partition))
+            except KeyError:
+                pass
+        return dropped
+
+    async def on_partitions_revoked(self, revoked: Iterable[Hashable]) -> None:
+        """
+        Rebalance callback, run while the partitions are still assigned
+
+        Stops their workers, cancelling any batch in progress, and commits the batches they
+        finished, so the new owner starts after them and no handler of ours races its own.
+        """
+        dropped = await self._drop_workers(revoked)
+        if self._consumer is not None:
+            await self._commit(self._consumer, dropped)
+        if dropped:
+            logger.info(f"Released partitions {sorted(tp.partition for tp in dropped)} of {self.topic}")
+
+    async def on_partitions_assigned(self, assigned: Iterable[Hashable]) -> None:
+        """
+        Rebalance callback, run once the new assignment is known
+
+        Drops the workers of partitions that are no longer assigned, e.g. lost without being
+        revoked; their offsets can no longer be committed.
+        """
+        assigned = set(assigned)
+        await self._drop_workers(tp for tp in list(self._workers) if tp not in assigned)
+        logger.info(f"Assigned partitions {sorted(tp.partition for tp in assigned)} of {self.topic}")
+
+    def _apply_backpressure(self, consumer: Any) -> None:
+        paused = set(consumer.paused())
+        for tp, worker in self._assigned_workers(consumer).items():
+            if worker.pending >= self.max_pending and tp not in paused:
+                consumer.pause(tp)
+            elif worker.pending < self.max_pending // 2 and tp in paused:
+                consumer.resume(tp)
+
+    def _record_lag(self, consumer: Any) -> None:
+        for tp, worker in self._assigned_workers(consumer).items():
+            highwater = consumer.highwater(tp)
+            if highwater is None:
+                continue
+            position = worker.processed_offset if worker.processed_offset is not None else worker.first_offset
+            KAFKA_CONSUMER_LAG.labels(self.topic, str(tp.partition)).set(highwater - position)
+
+    async def _start_consumer(self) -> Any:
+        # Keep retrying with backoff, e.g. while the broker is unreachable at boot, like the
+        # poll loop below does for errors once consuming
+        delay = 1.0
+        while True:
+            try:
+                return await get_consumer(self.topic, listener=self)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error starting consumer for {self.topic}, retrying in {delay:.0f}s: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    async def run(self) -> None:
+        """
+        Consume the topic until cancelled
+        """
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        consumer = self._consumer = await self._start_consumer()
+
+        try:
+            logger.info(f"Consumer for {self.topic} started")
+            while True:
+                try:
+                    # Get batch of messages, polling faster while partitions wait to be resumed
+                    timeout_ms = 100 if consumer.paused() else 1000
+                    messages = await consumer.getmany(timeout_ms=timeout_ms, max_records=self.max_records)
+
+                    assigned = consumer.assignment()
+                    for tp, message_list in messages.items():
+                        # Skip records of a partition revoked since they were fetched
+                        if not message_list or tp not in assigned:
+                            continue
+                        worker = self._workers.get(tp)
+                        if worker is None:
+                            worker = self._workers[tp] = _PartitionWorker(self, tp)
+                        worker.submit(message_list)
+
+                    await self._commit(consumer, self._assigned_workers(consumer))
+                    self._apply_backpressure(consumer)
+                    self._record_lag(consumer)
+
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error consuming messages: {str(e)}")
+                    # Brief pause before retry
+                    await asyncio.sleep(1)
+
+        finally:
+            # Stop the workers and commit what they finished before closing the consumer
+            for worker in self._workers.values():
+                await worker.stop()
+            await self._commit(consumer, self._assigned_workers(consumer))
+            self._workers.clear()
+            self._consumer = None
+            await consumer.stop()
+            logger.info(f"Consumer for {self.topic} stopped")
@@ -1,9 +1,14 @@
+import asyncio
 import logging
 import os
-from typing import Optional
+import time
+import zlib
+from collections import defaultdict
+from functools import partial
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-# This is a placeholder for a real Kafka client implementation
-# In a real application, you would use a library like aiokafka or confluent-kafka-python
+from app.core.config import settings
+from app.core.metrics import KAFKA_PRODUCE_DURATION, KAFKA_PRODUCE_ERRORS
 
 logger = logging.getLogger(__name__)
 
@@ -17,67 +22,422 @@ _producer = None
 async def get_producer():
     """
     Returns a singleton Kafka producer instance
+
+    The backend is chosen by KAFKA_PRODUCER_BACKEND: "aiokafka" for a real broker,
+    "memory" for the in-process fake broker and "mock" to only log messages.
     """
     global _producer
     if _producer is None:
-        # In a real application, you would initialize a real Kafka producer here
-        # For example, with aiokafka:
-        # from aiokafka import AIOKafkaProducer
-        # _producer = AIOKafkaProducer(
-        #     bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS
-        # )
-        # await _producer.start()
-        
-        # This is a mock producer for demonstration
-        _producer = MockKafkaProducer()
-        logger.info("Kafka producer initialized")
-    
+        backend = settings.KAFKA_PRODUCER_BACKEND
+        if backend == "aiokafka":
+            from aiokafka import AIOKafkaProducer
+
+            client = AIOKafkaProducer(
+                bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+                linger_ms=settings.KAFKA_LINGER_MS,
+                max_batch_size=settings.KAFKA_MAX_BATCH_SIZE,
+                compression_type=settings.KAFKA_COMPRESSION_TYPE,
+                enable_idempotence=settings.KAFKA_ENABLE_IDEMPOTENCE,
+                # Idempotence requires acknowledgement from all in-sync replicas
+                acks="all" if settings.KAFKA_ENABLE_IDEMPOTENCE else 1,
+                request_timeout_ms=settings.KAFKA_REQUEST_TIMEOUT_MS,
+            )
+            producer = KafkaProducer(client, max_in_flight=settings.KAFKA_MAX_IN_FLIGHT)
+        elif backend == "memory":
+            client = InMemoryKafkaProducer(
+                memory_broker, linger_ms=settings.KAFKA_LINGER_MS, max_batch_size=settings.KAFKA_MAX_BATCH_SIZE
+            )
+            producer = KafkaProducer(client, max_in_flight=settings.KAFKA_MAX_IN_FLIGHT)
+        else:
+            # This is a mock producer for demonstration
+            producer = MockKafkaProducer()
+        await producer.start()
+        _producer = producer
+        logger.info(f"Kafka producer initialized ({backend})")
+
     return _producer
 
-async def get_consumer(topic: str):
+async def start_producer() -> None:
+    """Create and start the producer singleton, called on application startup"""
+    await get_producer()
+
+async def stop_producer() -> None:
+    """Flush pending messages and stop the producer singleton, called on application shutdown"""
+    global _producer
+    if _producer is not None:
+        producer, _producer = _producer, None
+        await producer.stop()
+
+def _aiokafka_rebalance_listener(listener: Any) -> Any:
+    # aiokafka only accepts subclasses of its ConsumerRebalanceListener
+    from aiokafka import ConsumerRebalanceListener
+
+    class RebalanceListener(ConsumerRebalanceListener):
+        async def on_partitions_revoked(self, revoked):
+            await listener.on_partitions_revoked(revoked)
+
+        async def on_partitions_assigned(self, assigned):
+            await listener.on_partitions_assigned(assigned)
+
+    return RebalanceListener()
+
+async def get_consumer(topic: str, listener: Optional[Any] = None):
     """
-    Creates a new Kafka consumer for the specified topic
-    
+    Creates and starts a new Kafka consumer for the specified topic
+
+    Offsets are committed explicitly by the consumer engine, so auto-commit is disabled.
+    The backend is chosen by KAFKA_CONSUMER_BACKEND, like the producer's.
+
     Args:
         topic: The Kafka topic to subscribe to
+        listener: Object with async on_partitions_revoked(partitions) and
+            on_partitions_assigned(partitions) methods, called around group rebalances
     """
-    # In a real application, you would initialize a real Kafka consumer here
-    # For example, with aiokafka:
-    # from aiokafka import AIOKafkaConsumer
-    # consumer = AIOKafkaConsumer(
-    #     topic,
-    #     bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
-    #     group_id=KAFKA_CONSUMER_GROUP,
-    #     auto_offset_reset="earliest"
-    # )
-    # await consumer.start()
-    
-    # This is a mock consumer for demonstration
-    consumer = MockKafkaConsumer(topic)
-    logger.info(f"Kafka consumer initialized for topic {topic}")
+    backend = settings.KAFKA_CONSUMER_BACKEND
+    if backend == "aiokafka":
+        from aiokafka import AIOKafkaConsumer
+
+        consumer = AIOKafkaConsumer(
+            bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+            group_id=KAFKA_CONSUMER_GROUP,
+            auto_offset_reset="earliest",
+            enable_auto_commit=False,
+            max_poll_records=settings.KAFKA_CONSUMER_MAX_RECORDS,
+        )
+        consumer.subscribe(
+            [topic], listener=_aiokafka_rebalance_listener(listener) if listener is not None else None
+        )
+    elif backend == "memory":
+        consumer = InMemoryKafkaConsumer(memory_broker, topic, listener=listener)
+    else:
+        # This is a mock consumer for demonstration
+        consumer = MockKafkaConsumer(topic)
+    try:
+        await consumer.start()
+    except BaseException:
+        # Release the client of a consumer that could not reach the broker
+        await consumer.stop()
+        raise
+    logger.info(f"Kafka consumer initialized for topic {topic} ({backend})")
     return consumer
 
+class KafkaProducer:
+    """
+    Batched producer with a bounded number of in-flight messages
+
+    Wraps an AIOKafkaProducer (or the in-memory fake) whose linger/batch settings do the
+    batching. `send` only waits for a free in-flight slot and the client to accept the
+    message, and returns a future that resolves once the broker acknowledges it.
+    """
+
+    def __init__(self, client: Any, max_in_flight: int = 10000):
+        self._client = client
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self.sent_total = 0
+        self.errors_total = 0
+
+    async def start(self) -> None:
+        await self._client.start()
+
+    async def send(self, topic: str, value: bytes, key: Optional[bytes] = None) -> asyncio.Future:
+        """
+        Enqueue a message without waiting for delivery
+
+        Waits only when max_in_flight messages are still unacknowledged.
+        """
+        await self._in_flight.acquire()
+        started = time.perf_counter()
+        try:
+            future = await self._client.send(topic, value=value, key=key)
+        except Exception:
+            self._in_flight.release()
+            self.errors_total += 1
+            KAFKA_PRODUCE_ERRORS.labels(topic).inc()
+            raise
+        future.add_done_callback(partial(self._on_delivery, topic, started))
+        return future
+
+    def _on_delivery(self, topic: str, started: float, future: asyncio.Future) -> None:
+        self._in_flight.release()
+        if future.cancelled() or future.exception() is not None:
+            self.errors_total += 1
+            KAFKA_PRODUCE_ERRORS.labels(topic).inc()
+        else:
+            self.sent_total += 1
+            KAFKA_PRODUCE_DURATION.labels(topic).observe(time.perf_counter() - started)
+
+    async def send_and_wait(self, topic: str, value: bytes, key: Optional[bytes] = None) -> Any:
+        """Send a message and wait for the broker to acknowledge it"""
+        return await (await self.send(topic, value=value, key=key))
+
+    async def flush(self) -> None:
+        """Wait until every enqueued message has been delivered"""
+        await self._client.flush()
+
+    async def stop(self) -> None:
+        await self.flush()
+        await self._client.stop()
+        logger.info("Kafka producer stopped")
+
+    def stats(self) -> Dict[str, int]:
+        return {"sent_total": self.sent_total, "errors_total": self.errors_total}
+
+class RecordMetadata(NamedTuple):
+    topic: str
+    partition: int
+    offset: int
+
+class InMemoryKafkaBroker:
+    """
+    In-process stand-in for a Kafka cluster
+
+    Keeps every partition's records in memory and records each produce request,
+    so batching behavior and throughput can be measured without a live broker.
+    """
+
+    def __init__(self, partitions: int = 3):
+        self.partitions = partitions
+        self.records: Dict[Tuple[str, int], List[Tuple[Optional[bytes], bytes]]] = defaultdict(list)
+        self.produce_requests: List[Tuple[str, int, int]] = []  # (topic, partition, record count)
+        self._round_robin = 0
+
+    def partition_for(self, key: Optional[bytes]) -> int:
+        if key is None:
+            self._round_robin += 1
+            return self._round_robin % self.partitions
+        return zlib.crc32(key) % self.partitions
+
+    def append_batch(self, topic: str, partition: int, records: List[Tuple[Optional[bytes], bytes]]) -> int:
+        """Append a batch to a partition and return the offset of its first record"""
+        log = self.records[(topic, partition)]
+        base_offset = len(log)
+        log.extend(records)
+        self.produce_requests.append((topic, partition, len(records)))
+        return base_offset
+
+    def messages(self, topic: str) -> List[Tuple[Optional[bytes], bytes]]:
+        """All records of a topic, partition by partition"""
+        return [
+            record
+            for partition in range(self.partitions)
+            for record in self.records.get((topic, partition), [])
+        ]
+
+    def reset(self) -> None:
+        self.records.clear()
+        self.produce_requests.clear()
+
+class InMemoryKafkaProducer:
+    """
+    Fake AIOKafkaProducer writing to an InMemoryKafkaBroker
+
+    Messages are accumulated per partition and sent as one produce request when the batch
+    reaches max_batch_size bytes or linger_ms has passed since its first message.
+    """
+
+    def __init__(self, broker: InMemoryKafkaBroker, linger_ms: int = 5, max_batch_size: int = 16384):
+        self.broker = broker
+        self.linger_ms = linger_ms
+        self.max_batch_size = max_batch_size
+        self._batches: Dict[Tuple[str, int], List[Tuple[Optional[bytes], bytes, asyncio.Future]]] = {}
+        self._batch_bytes: Dict[Tuple[str, int], int] = defaultdict(int)
+        self._linger_timers: Dict[Tuple[str, int], asyncio.TimerHandle] = {}
+
+    async def start(self) -> None:
+        pass
+
+    async def send(self, topic: str, value: bytes, key: Optional[bytes] = None) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        tp = (topic, self.broker.partition_for(key))
+        future = loop.create_future()
+        self._batches.setdefault(tp, []).append((key, value, future))
+        self._batch_bytes[tp] += len(value) + len(key or b"")
+        if self._batch_bytes[tp] >= self.max_batch_size:
+            self._send_batch(tp)
+        elif tp not in self._linger_timers:
+            self._linger_timers[tp] = loop.call_later(self.linger_ms / 1000, self._send_batch, tp)
+        return future
+
+    def _send_batch(self, tp: Tuple[str, int]) -> None:
+        timer = self._linger_timers.pop(tp, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._batches.pop(tp, [])
+        self._batch_bytes.pop(tp, None)
+        if not batch:
+            return
+        topic, partition = tp
+        base_offset = self.broker.append_batch(topic, partition, [(key, value) for key, value, _ in batch])
+        for index, (_, _, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(RecordMetadata(topic, partition, base_offset + index))
+
+    async def send_and_wait(self, topic: str, value: bytes, key: Optional[bytes] = None) -> RecordMetadata:
+        return await (await self.send(topic, value=value, key=key))
+
+    async def flush(self) -> None:
+        for tp in list(self._batches):
+            self._send_batch(tp)
+
+    async def stop(self) -> None:
+        await self.flush()
+
+class TopicPartition(NamedTuple):
+    topic: str
+    partition: int
+
+class ConsumerRecord(NamedTuple):
+    topic: str
+    partition: int
+    offset: int
+    key: Optional[bytes]
+    value: bytes
+
+class IllegalStateError(Exception):
+    """Raised by the fake consumer where aiokafka raises IllegalStateError or CommitFailedError"""
+
+class InMemoryKafkaConsumer:
+    """
+    Fake AIOKafkaConsumer reading one topic from an InMemoryKafkaBroker
+
+    Supports the subset the consumer engine uses: getmany, commit, pause/resume, highwater,
+    assignment and a rebalance listener. Every partition is assigned on start; rebalance()
+    moves the assignment the way a group rebalance does.
+    """
+
+    def __init__(self, broker: InMemoryKafkaBroker, topic: str, listener: Optional[Any] = None):
+        self.broker = broker
+        self.topic = topic
+        self.listener = listener
+        self.committed: Dict[TopicPartition, int] = {}
+        self._positions: Dict[TopicPartition, int] = {}
+        self._paused: set = set()
+        self._assignment: set = set()
+
+    async def start(self) -> None:
+        await self.rebalance(range(self.broker.partitions))
+
+    async def rebalance(self, partitions: Any) -> None:
+        """
+        Replace the assignment with the given partition numbers
+
+        Like aiokafka's eager rebalance, the listener sees every current partition revoked
+        while they are still assigned, then the new assignment; fetching of an assigned
+        partition restarts from its committed offset.
+        """
+        if self.listener is not None and self._assignment:
+            await self.listener.on_partitions_revoked(set(self._assignment))
+        self._assignment = {TopicPartition(self.topic, partition) for partition in partitions}
+        self._positions.clear()
+        self._paused.clear()
+        if self.listener is not None:
+            await self.listener.on_partitions_assigned(set(self._assignment))
+
+    def assignment(self) -> set:
+        return set(self._assignment)
+
+    def _check_assigned(self, partitions: Any) -> None:
+        unassigned = set(partitions) - self._assignment
+        if unassigned:
+            raise IllegalStateError(f"Partitions not assigned: {sorted(unassigned)}")
+
+    async def getmany(self, timeout_ms: int = 0, max_records: Optional[int] = None) -> Dict[TopicPartition, List[ConsumerRecord]]:
+        batch: Dict[TopicPartition, List[ConsumerRecord]] = {}
+        fetched = 0
+        for partition in range(self.broker.partitions):
+            tp = TopicPartition(self.topic, partition)
+            if tp in self._paused or tp not in self._assignment:
+                continue
+            log = self.broker.records.get((self.topic, partition), [])
+            position = self._positions.get(tp, self.committed.get(tp, 0))
+            end = len(log) if max_records is None else min(len(log), position + max_records - fetched)
+            if end > position:
+                batch[tp] = [
+                    ConsumerRecord(self.topic, partition, offset, *log[offset])
+                    for offset in range(position, end)
+                ]
+                self._positions[tp] = end
+                fetched += end - position
+        if not batch and timeout_ms:
+            await asyncio.sleep(timeout_ms / 1000)
+        return batch
+
+    async def commit(self, offsets: Dict[TopicPartition, int]) -> None:
+        self._check_assigned(offsets)
+        self.committed.update(offsets)
+
+    def pause(self, *partitions: TopicPartition) -> None:
+        self._check_assigned(partitions)
+        self._paused.update(partitions)
+
+    def resume(self, *partitions: TopicPartition) -> None:
+        self._check_assigned(partitions)
+        self._paused.difference_update(partitions)
+
+    def paused(self) -> set:
+        return set(self._paused)
+
+    def highwater(self, tp: TopicPartition) -> int:
+        self._check_assigned([tp])
+        return len(self.broker.records.get((tp.topic, tp.partition), []))
+
+    async def stop(self) -> None:
+        pass
+
+# Shared fake broker used when KAFKA_PRODUCER_BACKEND or KAFKA_CONSUMER_BACKEND is "memory"
+memory_broker = InMemoryKafkaBroker()
+
 # Mock implementations for demonstration purposes
 class MockKafkaProducer:
+    async def start(self):
+        pass
+
+    async def send(self, topic, value, key=None):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(await self.send_and_wait(topic, value, key=key))
+        return future
+
     async def send_and_wait(self, topic, value, key=None):
         logger.info(f"Mock producer: Sending message to topic {topic}")
         logger.debug(f"Message: {value.decode('utf-8')}")
         return {"topic": topic, "partition": 0, "offset": 0}
-    
+
+    async def flush(self):
+        pass
+
     async def stop(self):
         logger.info("Mock producer: Stopped")
 
 class MockKafkaConsumer:
     def __init__(self, topic):
         self.topic = topic
-    
+
     async def start(self):
         logger.info(f"Mock consumer: Started for topic {self.topic}")
-    
-    async def getmany(self, timeout_ms=1000):
+
+    async def getmany(self, timeout_ms=1000, max_records=None):
         # This would normally return messages from Kafka
-        # For demonstration, we return an empty dict
+        # For demonstration, we wait out the poll timeout and return an empty dict
+        await asyncio.sleep(timeout_ms / 1000)
         return {}
-    
+
+    async def commit(self, offsets):
+        pass
+
+    def pause(self, *partitions):
+        pass
+
+    def resume(self, *partitions):
+        pass
+
+    def paused(self):
+        return set()
+
+    def assignment(self):
+        return set()
+
+    def highwater(self, tp):
+        return None
+
     async def stop(self):
-        logger.info(f"Mock consumer: Stopped for topic {self.topic}")
\ No newline at end of file
+        logger.info(f"Mock consumer: Stopped for topic {self.topic}")
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.events.kafka_client import get_producer
+from app.models.outbox import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+# Key of the PostgreSQL advisory lock held by the relay that is publishing a batch
+OUTBOX_RELAY_LOCK_ID = 0x6F7574626F78  # "outbox"
+
+def add_outbox_event(db: Session, topic: str, key: Optional[str], event_data: Dict[str, Any]) -> OutboxEvent:
+    """
+    Stage an event in the outbox as part of the caller's transaction
+
+    The event is only published once the transaction commits, and is never lost
+    if Kafka is unavailable at that moment.
+
+    Args:
+        db: The database session the CRUD change is being made in
+        topic: The Kafka topic to publish to
+        key: The Kafka message key
+        event_data: The event payload
+    """
+    event = OutboxEvent(topic=topic, key=key, payload=json.dumps(event_data))
+    db.add(event)
+    return event
+
+async def get_outbox_backlog(db: AsyncSession) -> int:
+    """Count events waiting to be published"""
+    return (await db.execute(select(func.count(OutboxEvent.id)))).scalar_one()
+
+class OutboxRelay:
+    """
+    Background task that drains the outbox into the Kafka producer in batches
+
+    Every worker runs a relay, but on PostgreSQL only one of them publishes at a time:
+    a batch is claimed under a transaction-level advisory lock, and a relay that cannot
+    take it skips the round. Batches claimed side by side would let a later event for a
+    key reach Kafka before an earlier one still in flight elsewhere, undoing the per-key
+    order the consumers rely on. Published rows are deleted in the claiming transaction.
+    Delivery is at-least-once: a crash between send and commit republishes the batch.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        batch_size: int = settings.OUTBOX_RELAY_BATCH_SIZE,
+        poll_interval: float = settings.OUTBOX_RELAY_POLL_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.published_total = 0
+        self.batches_total = 0
+        self.failures_total = 0
+        self.last_batch_seconds = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def relay_batch(self) -> int:
+        """Publish one batch of outbox events and return how many were published"""
+        async with self.session_factory() as db:
+            async with db.begin():
+                connection = await db.connection()
+                if connection.dialect.name == "postgresql":
+                    locked = (await db.execute(
+                        text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": OUTBOX_RELAY_LOCK_ID}
+                    )).scalar_one()
+                    if not locked:
+                        # Another worker's relay is publishing
+                        return 0
+                events = (await db.execute(
+                    select(OutboxEvent)
+                    .order_by(OutboxEvent.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )).scalars().all()
+                if not events:
+                    return 0
+
+                started = time.perf_counter()
+                producer = await get_producer()
+                # Enqueue the whole batch so the producer can group it into few requests,
+                # then wait for the acknowledgements
+                deliveries = []
+                error: Optional[Exception] = None
+                try:
+                    for event in events:
+                        deliveries.append(await producer.send(
+                            topic=event.topic,
+                            value=event.payload.encode("utf-8"),
+                            key=event.key.encode("utf-8") if event.key is not None else None,
+                        ))
+                except Exception as e:
+                    error = e
+                results = await asyncio.gather(*deliveries, return_exceptions=True)
+
+                # Only the acknowledged prefix is removed, so a retry keeps the original order
+                published: List[int] = []
+                for event, result in zip(events, results):
+                    if isinstance(result, BaseException):
+                        error = error or result
+                        break
+                    published.append(event.id)
+
+                # Drop whatever made it out, even when the batch stopped part-way
+                if published:
+                    await db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(published)))
+                self.published_total += len(published)
+                self.batches_total += 1
+                self.last_batch_seconds = time.perf_counter() - started
+
+        if error is not None:
+            raise error
+        return len(published)
+
+    async def run(self) -> None:
+        """Drain the outbox until cancelled"""
+        logger.info("Outbox relay started")
+        while True:
+            try:
+                published = await self.relay_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures_total += 1
+                logger.error(f"Error relaying outbox events: {str(e)}")
+                published = 0
+            # Keep draining while batches come back full, otherwise wait for new events
+            if published < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        """Start the relay as a background task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Outbox relay stopped")
+
+    def counters(self) -> Dict[str, Any]:
+        """Return relay throughput counters without querying the database"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "published_total": self.published_total,
+            "batches_total": self.batches_total,
+            "failures_total": self.failures_total,
+            "last_batch_seconds": round(self.last_batch_seconds, 6),
+        }
+
+    async def stats(self) -> Dict[str, Any]:
+        """Return relay throughput counters and the current outbox backlog"""
+        async with self.session_factory() as db:
+            backlog = await get_outbox_backlog(db)
+        return {"backlog": backlog, **self.counters()}
+
+# Relay singleton started with the application
+outbox_relay = OutboxRelay()
@@ -1,12 +1,30 @@
 import json
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 
 # Import Kafka producer
 from app.events.kafka_client import get_producer
 
 logger = logging.getLogger(__name__)
 
+APPLICATION_EVENTS_TOPIC = "application-events"
+
+def build_application_created_event(application_id: int, application_name: str, domain_id: int) -> Dict[str, Any]:
+    """
+    Builds the payload of an application created event
+    
+    Args:
+        application_id: The ID of the created application
+        application_name: The name of the created application
+        domain_id: The ID of the domain this application belongs to
+    """
+    return {
+        "event_type": "application_created",
+        "application_id": application_id,
+        "application_name": application_name,
+        "domain_id": domain_id
+    }
+
 async def publish_application_created_event(application_id: int, application_name: str, domain_id: int) -> None:
     """
     Publishes an application created event to Kafka
@@ -18,12 +36,9 @@ async def publish_application_created_event(application_id: int, application_nam
     """
     try:
         # Create event payload
-        event_data = {
-            "event_type": "application_created",
-            "application_id": application_id,
-            "application_name": application_name,
-            "domain_id": domain_id
-        }
+        event_data = build_application_created_event(
+            application_id=application_id, application_name=application_name, domain_id=domain_id
+        )
         
         # Serialize to JSON
         event_json = json.dumps(event_data)
@@ -33,7 +48,7 @@ async def publish_application_created_event(application_id: int, application_nam
         
         # Send message to Kafka topic
         await producer.send_and_wait(
-            topic="application-events",
+            topic=APPLICATION_EVENTS_TOPIC,
             value=event_json.encode("utf-8"),
             key=str(application_id).encode("utf-8")
         )
@@ -0,0 +1,22 @@
+from typing import Any, Dict, List
+
+# Larger bulk updates are split over several events to stay well below Kafka's message size limit
+BULK_UPDATED_EVENT_MAX_IDS = 5000
+
+def build_applications_bulk_updated_event(
+    application_ids: List[int], changes: Dict[str, Any], domain_name: str
+) -> Dict[str, Any]:
+    """
+    Builds the payload of an event covering many applications updated by one bulk request
+    
+    Args:
+        application_ids: The IDs of the updated applications, all of one domain
+        changes: The fields set on every one of them and their new values
+        domain_name: The domain of the applications
+    """
+    return {
+        "event_type": "applications_bulk_updated",
+        "application_ids": application_ids,
+        "changes": changes,
+        "domain_name": domain_name,
+    }
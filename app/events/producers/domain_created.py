@@ -1,6 +1,6 @@
 import json
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 
 # Import Kafka producer (assuming a Kafka client is set up)
 # This is a placeholder and should be replaced with actual Kafka implementation
@@ -9,6 +9,22 @@ from app.events.kafka_client import get_producer
 
 logger = logging.getLogger(__name__)
 
+DOMAIN_EVENTS_TOPIC = "domain-events"
+
+def build_domain_created_event(domain_id: int, domain_name: str) -> Dict[str, Any]:
+    """
+    Builds the payload of a domain created event
+    
+    Args:
+        domain_id: The ID of the created domain
+        domain_name: The name of the created domain
+    """
+    return {
+        "event_type": "domain_created",
+        "domain_id": domain_id,
+        "domain_name": domain_name,
+    }
+
 async def publish_domain_created_event(domain_id: int, domain_name: str) -> None:
     """
     Publishes a domain created event to Kafka
@@ -19,11 +35,7 @@ async def publish_domain_created_event(domain_id: int, domain_name: str) -> None
     """
     try:
         # Create event payload
-        event_data = {
-            "event_type": "domain_created",
-            "domain_id": domain_id,
-            "domain_name": domain_name,
-        }
+        event_data = build_domain_created_event(domain_id=domain_id, domain_name=domain_name)
         
         # Serialize to JSON
         event_json = json.dumps(event_data)
@@ -33,7 +45,7 @@ async def publish_domain_created_event(domain_id: int, domain_name: str) -> None
         
         # Send message to Kafka topic
         await producer.send_and_wait(
-            topic="domain-events",
+            topic=DOMAIN_EVENTS_TOPIC,
             value=event_json.encode("utf-8"),
             key=str(domain_id).encode("utf-8")
         )
@@ -1,20 +1,95 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
+import logging
+import time
+from app.api.etag import ETAG_HEADER
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.api.routes import domain, application
 from app.core.config import settings
-from app.db.session import engine
+from app.core.inflight import InFlightMiddleware, in_flight_requests, install_sigterm_drain
+from app.core.metrics import (
+    METRICS_CONTENT_TYPE, PrometheusMiddleware, register_pool_collector, register_stats_collector, render_metrics
+)
+from app.core.security import close_auth_client, token_cache
+from app.crud.domain import get_domain_cache_stats
+from app.db.instrumentation import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, QueryStatsMiddleware
+from app.db.session import async_engine, engine, prewarm_async_pool
 from app.db.base import Base
-#from app.events.consumers import domain_events, application_events
+from app.events.kafka_client import start_producer, stop_producer
+from app.events.outbox import outbox_relay
+from app.events.consumers import domain_events, application_events
+
+logger = logging.getLogger(__name__)
+
+def _log_task_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_name()} failed: {str(task.exception())}")
+
+def _start_task(coro, name: str) -> asyncio.Task:
+    task = asyncio.create_task(coro, name=name)
+    task.add_done_callback(_log_task_failure)
+    return task
+
+async def _stop_task(task: asyncio.Task) -> None:
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception:
+        # Already logged when the task died; shutdown carries on with the rest
+        pass
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start the background machinery on startup and stop it in reverse order on shutdown
+
+    The schema is not touched here; it is managed by the Alembic migrations
+    (DB_CREATE_ALL_ON_STARTUP creates missing tables for local development).
+    """
+    started = time.perf_counter()
+    if settings.DB_CREATE_ALL_ON_STARTUP:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    if settings.DB_POOL_PREWARM:
+        await prewarm_async_pool()
+    await start_producer()
+    if settings.OUTBOX_RELAY_ENABLED:
+        outbox_relay.start()
+    consumer_tasks = []
+    if settings.KAFKA_CONSUMERS_ENABLED:
+        consumer_tasks = [
+            _start_task(domain_events.start_consumer(), "domain-events-consumer"),
+            _start_task(application_events.start_consumer(), "application-events-consumer"),
+        ]
+    # On SIGTERM, /health reports draining and requests keep being served until the
+    # drain is over; only then does the server stop accepting connections
+    restore_sigterm = install_sigterm_drain(
+        in_flight_requests, settings.SHUTDOWN_DRAIN_DELAY_SECONDS, settings.SHUTDOWN_DRAIN_TIMEOUT_SECONDS
+    )
+    logger.info(f"Startup completed in {time.perf_counter() - started:.3f}s")
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+    yield
+
+    restore_sigterm()
+    for task in consumer_tasks:
+        await _stop_task(task)
+    # Stop relaying first so the producer flush covers everything already handed over
+    await outbox_relay.stop()
+    await stop_producer()
+    await close_auth_client()
+    await async_engine.dispose()
+    engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Admin Service API for ZCare Platform",
     version="0.1.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set CORS middleware
@@ -24,8 +99,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER, QUERY_COUNT_HEADER, QUERY_TIME_HEADER],
 )
 
+# Per-request statement count and database time
+app.add_middleware(QueryStatsMiddleware, headers=settings.DB_QUERY_STATS_HEADERS)
+
+# Per-route latency and in-flight request metrics
+app.add_middleware(PrometheusMiddleware)
+
+# Requests the shutdown drain waits for
+app.add_middleware(InFlightMiddleware)
+
+register_pool_collector({"sync": engine, "async": async_engine.sync_engine})
+register_stats_collector("domain_cache", get_domain_cache_stats)
+register_stats_collector("token_cache", token_cache.stats)
+register_stats_collector("outbox_relay", outbox_relay.counters)
+
 # Include routers
 app.include_router(domain.router, prefix=settings.API_V1_STR)
 app.include_router(application.router, prefix=settings.API_V1_STR)
@@ -35,24 +125,19 @@ async def root():
     return {"message": "Welcome to ZCare Admin Service"}
 
 @app.get("/health")
-async def health_check():
+async def health_check(response: Response):
+    if in_flight_requests.draining:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "draining"}
     return {"status": "healthy"}
 
-# Event consumers startup and shutdown
-"""
-@app.on_event("startup")
-async def startup_event_consumers():
-    # Start event consumers in background tasks
-    #asyncio.create_task(domain_events.start_consumer())
-    #asyncio.create_task(application_events.start_consumer())
-    app.state.event_consumers_running = True
-    print("Event consumers started")
-
-@app.on_event("shutdown")
-async def shutdown_event_consumers():
-    # Event consumers will be stopped when their tasks are cancelled
-    app.state.event_consumers_running = False
-    print("Event consumers stopped")"""
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/outbox/stats")
+async def outbox_stats():
+    return await outbox_relay.stats()
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text, ForeignKey, Index, JSON, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -6,6 +7,27 @@ from app.db.session import Base
 
 class Application(Base):
     __tablename__ = "applications"
+    __table_args__ = (
+        # Serves the (domain_name, id) keyset ordering used by the per-domain listing
+        Index("ix_applications_domain_name_id", "domain_name", "id"),
+        # Application names are unique within a domain
+        UniqueConstraint("domain_name", "application_name", name="uq_applications_domain_name_application_name"),
+        # pg_trgm indexes serving the substring matches of /applications/search
+        Index(
+            "ix_applications_application_name_trgm", "application_name",
+            postgresql_using="gin", postgresql_ops={"application_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_applications_application_code_trgm", "application_code",
+            postgresql_using="gin", postgresql_ops={"application_code": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_applications_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+        # Serves the config containment (@>) filter of /applications/by_config
+        Index("ix_applications_config", "config", postgresql_using="gin", postgresql_ops={"config": "jsonb_path_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     application_name = Column(String(100), index=True, nullable=False)  # Changed from `name` to `application_name`
@@ -13,8 +35,10 @@ class Application(Base):
     description = Column(Text, nullable=True)
     status = Column(Boolean, default=True)  # Changed from `is_active` to `status`
     action = Column(String(50), nullable=True)  # Added `action` field
-    domain_name = Column(String(100), ForeignKey("domains.domain_name"), nullable=False)  # Changed to `domain_name` as ForeignKey
-    config = Column(Text, nullable=True)  # JSON stored as text
+    domain_name = Column(
+        String(100), ForeignKey("domains.domain_name", ondelete="CASCADE"), nullable=False
+    )  # Changed to `domain_name` as ForeignKey; deleting a domain deletes its applications
+    config = Column(JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -6,6 +6,21 @@ from app.db.session import Base
 
 class Domain(Base):
     __tablename__ = "domains"
+    __table_args__ = (
+        # pg_trgm indexes serving the substring matches of /domains/search
+        Index(
+            "ix_domains_domain_name_trgm", "domain_name",
+            postgresql_using="gin", postgresql_ops={"domain_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_domains_domain_code_trgm", "domain_code",
+            postgresql_using="gin", postgresql_ops={"domain_code": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_domains_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     domain_name = Column(String(100), unique=True, index=True, nullable=False)  # Formerly 'name'
@@ -17,7 +32,15 @@ class Domain(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    applications = relationship("Application", back_populates="domain", cascade="all, delete-orphan")
+    # passive_deletes leaves removing the applications of a deleted domain to the
+    # database's ON DELETE CASCADE instead of loading and deleting them one by one
+    applications = relationship(
+        "Application",
+        back_populates="domain",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="Application.id",
+    )
     
     def __repr__(self):
         return f"<Domain {self.name}>"
\ No newline at end of file
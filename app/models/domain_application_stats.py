@@ -0,0 +1,19 @@
+from sqlalchemy import Boolean, Column, Integer, String
+
+from app.db.session import Base
+
+class DomainApplicationStats(Base):
+    """
+    Application counts per (domain, status, action), maintained by the application writes
+
+    NULL status and action are stored as false and "" so the key can be the primary key.
+    """
+    __tablename__ = "domain_application_stats"
+
+    domain_name = Column(String(100), primary_key=True)
+    status = Column(Boolean, primary_key=True)
+    action = Column(String(50), primary_key=True, server_default="")
+    application_count = Column(Integer, nullable=False, server_default="0")
+
+    def __repr__(self):
+        return f"<DomainApplicationStats {self.domain_name} {self.status} {self.action!r}: {self.application_count}>"
@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+class OutboxEvent(Base):
+    __tablename__ = "event_outbox"
+
+    id = Column(BigInteger().with_variant(Integer(), "sqlite"), primary_key=True)
+    topic = Column(String(255), nullable=False)
+    key = Column(String(255), nullable=True)
+    payload = Column(Text, nullable=False)  # JSON-encoded event body
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<OutboxEvent {self.id} {self.topic}>"
@@ -1,7 +1,19 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+import json
+from pydantic import BaseModel, Field, validator
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
+from app.schemas.common import BulkItemError
+
+def _parse_config(cls, v: Any) -> Any:
+    # Accept the JSON-encoded strings clients sent before config became structured
+    if isinstance(v, str):
+        try:
+            return json.loads(v) if v.strip() else None
+        except ValueError:
+            raise ValueError("config must be a JSON object")
+    return v
+
 class ApplicationBase(BaseModel):
     application_name: str = Field(..., min_length=3, max_length=100)  # Changed from `name`
     application_code: str = Field(..., min_length=3, max_length=50)   # Added as `Application code`
@@ -9,7 +21,9 @@ class ApplicationBase(BaseModel):
     status: Optional[bool] = True  # Changed from `is_active`
     action: Optional[str] = None  # Added `action`
     domain_name: str = Field(..., min_length=3, max_length=100)  # Changed from `domain_id` to `domain_name`
-    config: Optional[str] = None  # JSON stored as text
+    config: Optional[Dict[str, Any]] = None  # Stored as JSONB
+
+    _parse_config = validator("config", pre=True, allow_reuse=True)(_parse_config)
 
 class ApplicationCreate(ApplicationBase):
     pass
@@ -21,7 +35,9 @@ class ApplicationUpdate(BaseModel):
     status: Optional[bool] = None  # Updated from `is_active`
     action: Optional[str] = None  # Added
     domain_name: Optional[str] = Field(None, min_length=3, max_length=100)  # Updated
-    config: Optional[str] = None  # No changes
+    config: Optional[Dict[str, Any]] = None
+
+    _parse_config = validator("config", pre=True, allow_reuse=True)(_parse_config)
 
 class ApplicationResponse(ApplicationBase):
     id: int
@@ -29,4 +45,45 @@ class ApplicationResponse(ApplicationBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+class ApplicationPage(BaseModel):
+    items: List[ApplicationResponse]
+    total: int
+    total_is_estimate: bool
+    next_cursor: Optional[str] = None
+
+class ApplicationBulkCreate(BaseModel):
+    items: List[ApplicationCreate] = Field(..., min_length=1, max_length=1000)
+
+class ApplicationBulkResponse(BaseModel):
+    created: List[ApplicationResponse]
+    errors: List[BulkItemError]
+
+class ApplicationBulkFilter(BaseModel):
+    status: Optional[bool] = None
+    action: Optional[str] = None
+
+class ApplicationBulkChanges(BaseModel):
+    description: Optional[str] = None
+    status: Optional[bool] = None
+    action: Optional[str] = None
+    config: Optional[Dict[str, Any]] = None
+
+    _parse_config = validator("config", pre=True, allow_reuse=True)(_parse_config)
+
+class ApplicationBulkUpdate(BaseModel):
+    # Select the applications either by id or by domain, optionally narrowed by filter
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    domain_name: Optional[str] = None
+    # A domain is updated in id order, at most limit applications per request;
+    # pass next_cursor back as cursor to continue
+    cursor: Optional[str] = None
+    limit: int = Field(1000, ge=1, le=1000)
+    filter: ApplicationBulkFilter = ApplicationBulkFilter()
+    changes: ApplicationBulkChanges
+
+class ApplicationBulkUpdateResponse(BaseModel):
+    updated: int
+    ids: List[int]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,13 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class BulkItemError(BaseModel):
+    index: int  # Position of the rejected item in the request batch
+    detail: str
+
+
+class TotalMode(str, Enum):
+    exact = "exact"  # COUNT(*) on every request
+    approximate = "approximate"  # Planner estimate or a recently cached count
@@ -1,6 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+from enum import Enum
+
+from app.schemas.application import ApplicationResponse
+from app.schemas.common import BulkItemError
 
 class DomainBase(BaseModel):
     domain_name: str = Field(..., alias="domain_name", min_length=3, max_length=100)
@@ -26,3 +30,35 @@ class DomainResponse(DomainBase):
 
     class Config:
         from_attributes = True
+
+class DomainInclude(str, Enum):
+    applications = "applications"
+
+class DomainWithApplicationsResponse(DomainResponse):
+    # Only present when the request asked for ?include=applications
+    applications: Optional[List[ApplicationResponse]] = None
+
+class DomainPage(BaseModel):
+    items: List[DomainWithApplicationsResponse]
+    total: int
+    total_is_estimate: bool
+    next_cursor: Optional[str] = None
+
+class DomainStatsBreakdown(BaseModel):
+    status: bool  # Applications without a status are counted as inactive
+    action: Optional[str] = None
+    application_count: int
+
+class DomainStatsResponse(BaseModel):
+    domain_name: str
+    application_count: int
+    active_count: int
+    inactive_count: int
+    breakdown: List[DomainStatsBreakdown]
+
+class DomainBulkCreate(BaseModel):
+    items: List[DomainCreate] = Field(..., min_length=1, max_length=1000)
+
+class DomainBulkResponse(BaseModel):
+    created: List[DomainResponse]
+    errors: List[BulkItemError]
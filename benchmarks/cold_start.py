@@ -0,0 +1,189 @@
+"""
+Measure how long a fresh worker takes to become ready.
+
+Each run starts a new Python process that imports ``app.main``, runs the lifespan
+startup and serves one request through an in-process ASGI client, timing each phase.
+Runs are repeated ``--runs`` times per variant and the medians reported as JSON.
+
+The ``create_all`` variant sets DB_CREATE_ALL_ON_STARTUP to show what the schema
+inspection used to add to every boot.
+
+With ``--shutdown`` a real uvicorn server is started instead, kept busy with list
+requests and sent SIGTERM. The report gives the seconds from the signal until /health
+returns 503, until the server stops accepting connections and until the process exits,
+and how many requests were served and failed after the signal. Failed means an error
+response or a dropped connection, not a refused one; a request sent on a keep-alive
+connection just as the server closes it also counts.
+
+Usage:
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --use-env-db --variants default create_all
+    python -m benchmarks.cold_start --shutdown --drain-delay 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+VARIANTS = {
+    "default": {},
+    "create_all": {"DB_CREATE_ALL_ON_STARTUP": "true"},
+    "no_prewarm": {"DB_POOL_PREWARM": "false"},
+}
+
+
+def child() -> None:
+    # Runs in the measured process; the interpreter start itself is timed by the parent
+    import asyncio
+
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    async def boot() -> dict:
+        import httpx
+
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                response = await client.get("/api/v1/domains/get_all_domains/", params={"limit": 1})
+                response.raise_for_status()
+            served = time.perf_counter()
+        stopped = time.perf_counter()
+        return {
+            "import_s": imported - started,
+            "startup_s": ready - imported,
+            "first_request_s": served - ready,
+            "shutdown_s": stopped - served,
+        }
+
+    print(json.dumps(asyncio.run(boot())))
+
+
+def run_once(env: dict) -> dict:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cold_start", "--child"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_s"] = time.perf_counter() - started
+    return result
+
+
+async def shutdown_once(env: dict, clients: int) -> dict:
+    import httpx
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"], env=env
+    )
+    events = {}
+    served = failed = 0
+    signalled = None
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal served, failed
+        while "refused_s" not in events:
+            try:
+                response = await client.get("/api/v1/domains/get_all_domains/", params={"limit": 10})
+            except httpx.ConnectError:
+                if signalled is not None:
+                    events.setdefault("refused_s", time.perf_counter() - signalled)
+                continue
+            except httpx.TransportError:
+                failed += signalled is not None
+                continue
+            if signalled is not None:
+                if response.status_code == 200:
+                    served += 1
+                else:
+                    failed += 1
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        while True:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.05)
+        workers = [asyncio.create_task(client_loop(client)) for _ in range(clients)]
+        await asyncio.sleep(1)
+        signalled = time.perf_counter()
+        server.send_signal(signal.SIGTERM)
+        while "not_ready_s" not in events and "refused_s" not in events:
+            try:
+                if (await client.get("/health")).status_code == 503:
+                    events["not_ready_s"] = time.perf_counter() - signalled
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*workers)
+    await asyncio.get_running_loop().run_in_executor(None, server.wait)
+    not_ready = events.get("not_ready_s")
+    return {
+        "not_ready_s": None if not_ready is None else round(not_ready, 4),
+        "stopped_accepting_s": round(events["refused_s"], 4),
+        "exited_s": round(time.perf_counter() - signalled, 4),
+        "served_after_sigterm": served,
+        "failed_after_sigterm": failed,
+    }
+
+
+def prepare_env(use_env_db: bool) -> dict:
+    base_env = dict(os.environ)
+    if not use_env_db:
+        from benchmarks.seed import configure_database, seed
+
+        configure_database(False)
+        base_env["SQLALCHEMY_DATABASE_URI"] = os.environ["SQLALCHEMY_DATABASE_URI"]
+        seed(10, 1)
+    return base_env
+
+
+def main_shutdown(args: argparse.Namespace) -> None:
+    env = {**prepare_env(args.use_env_db), "SHUTDOWN_DRAIN_DELAY_SECONDS": str(args.drain_delay)}
+    runs = [asyncio.run(shutdown_once(env, args.clients)) for _ in range(args.runs)]
+    print(json.dumps({"drain_delay_s": args.drain_delay, "runs": runs}, indent=2))
+
+
+def main(args: argparse.Namespace) -> None:
+    base_env = prepare_env(args.use_env_db)
+
+    report = {}
+    for variant in args.variants:
+        env = {**base_env, **VARIANTS[variant]}
+        runs = [run_once(env) for _ in range(args.runs)]
+        report[variant] = {
+            key: round(statistics.median(run[key] for run in runs), 4) for key in runs[0]
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--variants", nargs="+", choices=sorted(VARIANTS), default=["default", "create_all"])
+    parser.add_argument("--use-env-db", action="store_true", help="Boot against the configured database")
+    parser.add_argument("--shutdown", action="store_true", help="Measure the SIGTERM drain of a uvicorn server")
+    parser.add_argument("--drain-delay", type=float, default=2.0, help="SHUTDOWN_DRAIN_DELAY_SECONDS for --shutdown")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent request loops for --shutdown")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+    elif args.shutdown:
+        main_shutdown(args)
+    else:
+        main(args)
@@ -0,0 +1,69 @@
+"""
+Compare the sync and async database paths under concurrent load.
+
+Each simulated client runs a query that spends ``--query-ms`` on the database server
+(``pg_sleep``) from inside an ``async def`` coroutine, the way the API routes do.
+The sync path calls a psycopg2 ``Session`` directly and therefore blocks the event
+loop; the async path awaits an ``AsyncSession`` and lets the other clients proceed.
+
+Usage:
+    python -m benchmarks.db_concurrency --clients 500 --query-ms 20
+
+Requires a reachable PostgreSQL configured through the usual settings / .env.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import text
+
+from app.db.session import AsyncSessionLocal, SessionLocal
+
+SLOW_QUERY = text("SELECT pg_sleep(:seconds)")
+
+
+async def sync_client(seconds: float) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(SLOW_QUERY, {"seconds": seconds})
+    finally:
+        db.close()
+
+
+async def async_client(seconds: float) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(SLOW_QUERY, {"seconds": seconds})
+
+
+async def run(client, clients: int, seconds: float) -> dict:
+    started = time.perf_counter()
+    await asyncio.gather(*(client(seconds) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    return {
+        "clients": clients,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(clients / elapsed, 1),
+    }
+
+
+async def main(clients: int, query_ms: float) -> None:
+    seconds = query_ms / 1000
+    # Warm both pools so connection setup is not part of the measurement
+    await run(sync_client, 1, 0)
+    await run(async_client, 1, 0)
+
+    results = {
+        "sync": await run(sync_client, clients, seconds),
+        "async": await run(async_client, clients, seconds),
+    }
+    results["speedup"] = round(results["sync"]["elapsed_s"] / results["async"]["elapsed_s"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--query-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.query_ms))
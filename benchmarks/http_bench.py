@@ -0,0 +1,327 @@
+"""
+Measure latency and throughput of every domain and application route.
+
+Seeds ``--domains`` domains with ``--apps-per-domain`` applications each, then drives
+each route through an in-process ASGI client (httpx + ASGITransport, no network) with
+``--requests`` requests at every ``--concurrency`` level. Prints one JSON document with
+p50/p95/p99 latency, requests/sec and error counts per route and level, plus the commit
+it ran against, so runs can be diffed across commits.
+
+Reads run first, then writes; delete routes consume rows created before they are timed.
+Uses a scratch SQLite database unless ``--use-env-db`` is given, in which case the
+configured database (e.g. a local PostgreSQL) is seeded with ``bench-`` prefixed rows.
+
+Usage:
+    python -m benchmarks.http_bench --domains 1000 --apps-per-domain 10 --concurrency 1 10 50
+    python -m benchmarks.http_bench --use-env-db --routes get_domain get_all_applications --output run.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.seed import configure_database, seed
+
+PREFIX = "bench"
+API = "/api/v1"
+
+# (method, path, keyword arguments for httpx) for the i-th request of a run
+RequestSpec = Tuple[str, str, Dict[str, Any]]
+
+
+class Scenario:
+    """One route under test: how to build its i-th request and which status codes count as success"""
+
+    def __init__(
+        self,
+        name: str,
+        build: Callable[[int], RequestSpec],
+        expected: Tuple[int, ...] = (200,),
+        prepare: Optional[Callable[[int, str], None]] = None,
+    ):
+        self.name = name
+        self.build = build
+        self.expected = expected
+        self.prepare = prepare
+
+
+def build_scenarios(domain_ids: List[int], run_token: str) -> List[Scenario]:
+    application_ids = _application_ids()
+    first_domain = f"{PREFIX}-domain-0"
+    # Rows consumed by the delete scenarios, created per run before timing starts
+    doomed: Dict[str, List[int]] = {}
+
+    def prepare_domain_deletes(count: int, label: str) -> None:
+        doomed["domains"] = _create_domains(f"{PREFIX}-del-{run_token}-{label}", count)
+
+    def prepare_application_deletes(count: int, label: str) -> None:
+        doomed["applications"] = _create_applications(first_domain, f"{PREFIX}-del-{run_token}-{label}", count)
+
+    def pick(ids: List[int], i: int) -> int:
+        return ids[i % len(ids)]
+
+    sequence = itertools.count()
+
+    def unique(kind: str, i: int) -> str:
+        # Warmups re-use request indexes, so names come from a run-wide sequence instead
+        return f"{PREFIX}-{kind}-{run_token}-{next(sequence)}"
+
+    def domain_name(i: int) -> str:
+        return f"{PREFIX}-domain-{i % len(domain_ids)}"
+
+    return [
+        # Reads
+        Scenario("get_domain", lambda i: ("GET", f"{API}/domains/get_domain/{pick(domain_ids, i)}", {})),
+        Scenario("get_domain_include_applications", lambda i: (
+            "GET", f"{API}/domains/get_domain/{pick(domain_ids, i)}", {"params": {"include": "applications"}}
+        )),
+        Scenario("get_all_domains", lambda i: ("GET", f"{API}/domains/get_all_domains/", {"params": {"limit": 100}})),
+        Scenario("get_all_domains_include_applications", lambda i: (
+            "GET", f"{API}/domains/get_all_domains/", {"params": {"limit": 100, "include": "applications"}}
+        )),
+        Scenario("get_all_domains_total_exact", lambda i: (
+            "GET", f"{API}/domains/get_all_domains/", {"params": {"limit": 100, "total": "exact"}}
+        )),
+        Scenario("get_all_domains_total_approximate", lambda i: (
+            "GET", f"{API}/domains/get_all_domains/", {"params": {"limit": 100, "total": "approximate"}}
+        )),
+        Scenario("search_domains", lambda i: (
+            "GET", f"{API}/domains/search", {"params": {"q": f"domain-{i % len(domain_ids)}"}}
+        )),
+        Scenario("domain_stats", lambda i: ("GET", f"{API}/domains/stats", {})),
+        Scenario("domain_stats_one_domain", lambda i: (
+            "GET", f"{API}/domains/stats", {"params": {"domain_name": domain_name(i)}}
+        )),
+        Scenario("domain_cache_stats", lambda i: ("GET", f"{API}/domains/cache_stats", {})),
+        Scenario("get_application", lambda i: (
+            "GET", f"{API}/applications/get_application/{pick(application_ids, i)}", {}
+        )),
+        Scenario("get_applications_by_domain_name", lambda i: (
+            "GET", f"{API}/applications/get_applications_by_domain_name/{domain_name(i)}", {}
+        )),
+        Scenario("get_applications_by_domain_name_total_exact", lambda i: (
+            "GET", f"{API}/applications/get_applications_by_domain_name/{domain_name(i)}",
+            {"params": {"total": "exact"}},
+        )),
+        Scenario("get_all_applications", lambda i: (
+            "GET", f"{API}/applications/get_all_applications", {"params": {"limit": 100}}
+        )),
+        Scenario("get_all_applications_total_exact", lambda i: (
+            "GET", f"{API}/applications/get_all_applications", {"params": {"limit": 100, "total": "exact"}}
+        )),
+        Scenario("get_all_applications_total_approximate", lambda i: (
+            "GET", f"{API}/applications/get_all_applications", {"params": {"limit": 100, "total": "approximate"}}
+        )),
+        Scenario("search_applications", lambda i: (
+            "GET", f"{API}/applications/search", {"params": {"q": f"app-{i % 10}"}}
+        )),
+        Scenario("get_applications_by_config", lambda i: (
+            "GET", f"{API}/applications/by_config", {"params": {"contains": json.dumps({"tier": "gold"})}}
+        )),
+        Scenario("export_applications", lambda i: (
+            "GET", f"{API}/applications/export", {"params": {"domain_name": domain_name(i)}}
+        )),
+        # Writes
+        Scenario("create_domain", lambda i: ("POST", f"{API}/domains/create_domain/", {"json": {
+            "domain_name": unique("new", i), "domain_code": unique("new", i),
+        }}), expected=(201,)),
+        Scenario("bulk_create_domains", lambda i: ("POST", f"{API}/domains/bulk", {"json": {"items": [
+            {"domain_name": unique(f"bulk{j}", i), "domain_code": unique(f"bulk{j}", i)} for j in range(10)
+        ]}})),
+        Scenario("update_domain", lambda i: ("PUT", f"{API}/domains/update_domain/{pick(domain_ids, i)}", {
+            "json": {"description": f"updated {i}"}
+        })),
+        Scenario("create_application", lambda i: ("POST", f"{API}/applications/create_application/", {"json": {
+            "application_name": unique("app", i), "application_code": unique("app", i), "domain_name": first_domain,
+        }}), expected=(201,)),
+        Scenario("bulk_create_applications", lambda i: ("POST", f"{API}/applications/bulk", {"json": {"items": [
+            {
+                "application_name": unique(f"bulk{j}", i),
+                "application_code": unique(f"bulk{j}", i),
+                "domain_name": first_domain,
+            }
+            for j in range(10)
+        ]}})),
+        Scenario("update_application", lambda i: (
+            "PUT", f"{API}/applications/update_application/{pick(application_ids, i)}",
+            {"json": {"description": f"updated {i}"}},
+        )),
+        Scenario("bulk_update_applications_by_ids", lambda i: ("PATCH", f"{API}/applications/bulk", {"json": {
+            "ids": [pick(application_ids, i * 10 + j) for j in range(10)],
+            "changes": {"description": f"bulk updated {i}"},
+        }})),
+        Scenario("bulk_update_applications_by_domain", lambda i: ("PATCH", f"{API}/applications/bulk", {"json": {
+            "domain_name": domain_name(i), "changes": {"description": f"bulk updated {i}"},
+        }})),
+        # Deletes
+        Scenario("delete_domain", lambda i: (
+            "DELETE", f"{API}/domains/delete_domain/{doomed['domains'][i]}", {}
+        ), expected=(204,), prepare=prepare_domain_deletes),
+        Scenario("delete_application", lambda i: (
+            "DELETE", f"{API}/applications/delete_application/{doomed['applications'][i]}", {}
+        ), expected=(204,), prepare=prepare_application_deletes),
+    ]
+
+
+def _application_ids() -> List[int]:
+    from app.db.session import SessionLocal
+    from app.models.application import Application
+
+    db = SessionLocal()
+    try:
+        return [
+            row.id for row in db.query(Application.id)
+            .filter(Application.domain_name.like(f"{PREFIX}-domain-%"))
+            .order_by(Application.id)
+        ]
+    finally:
+        db.close()
+
+
+def _create_domains(prefix: str, count: int) -> List[int]:
+    from app.db.session import SessionLocal
+    from app.models.domain import Domain
+
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(Domain, [
+            {"domain_name": f"{prefix}-{i}", "domain_code": f"{prefix}-{i}"} for i in range(count)
+        ])
+        db.commit()
+        return [
+            row.id for row in db.query(Domain.id).filter(Domain.domain_name.like(f"{prefix}-%")).order_by(Domain.id)
+        ]
+    finally:
+        db.close()
+
+
+def _create_applications(domain_name: str, prefix: str, count: int) -> List[int]:
+    from app.db.session import SessionLocal
+    from app.models.application import Application
+
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(Application, [
+            {"application_name": f"{prefix}-{i}", "application_code": f"{prefix}-{i}", "domain_name": domain_name}
+            for i in range(count)
+        ])
+        db.commit()
+        return [
+            row.id for row in db.query(Application.id)
+            .filter(Application.application_code.like(f"{prefix}-%"))
+            .order_by(Application.id)
+        ]
+    finally:
+        db.close()
+
+
+async def run_level(client, scenario: Scenario, requests: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            method, path, kwargs = scenario.build(i)
+            started = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code not in scenario.expected:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "route": scenario.name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "requests_per_s": round(requests / elapsed, 1),
+    }
+
+
+async def run(args: argparse.Namespace, domain_ids: List[int]) -> List[Dict[str, Any]]:
+    import httpx
+
+    from app.main import app
+
+    run_token = str(int(time.time()))
+    scenarios = build_scenarios(domain_ids, run_token)
+    if args.routes:
+        unknown = set(args.routes) - {scenario.name for scenario in scenarios}
+        if unknown:
+            raise SystemExit(f"Unknown routes: {', '.join(sorted(unknown))}")
+        scenarios = [scenario for scenario in scenarios if scenario.name in args.routes]
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for scenario in scenarios:
+            for concurrency in args.concurrency:
+                if scenario.prepare is not None:
+                    scenario.prepare(args.requests, f"c{concurrency}")
+                # Warm caches, pools and code paths outside the measurement
+                warmup = Scenario(scenario.name, lambda i: scenario.build(args.requests - 1 - i), scenario.expected)
+                if scenario.prepare is None:
+                    await run_level(client, warmup, min(args.warmup, args.requests), 1)
+                result = await run_level(client, scenario, args.requests, concurrency)
+                results.append(result)
+                print(
+                    f"{result['route']:<40} c={concurrency:<4} p50={result['p50_ms']:>9.3f}ms "
+                    f"p99={result['p99_ms']:>9.3f}ms rps={result['requests_per_s']:>9.1f} errors={result['errors']}",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(args: argparse.Namespace) -> None:
+    database = configure_database(args.use_env_db)
+    domain_ids = seed(args.domains, args.apps_per_domain, prefix=PREFIX)
+    results = asyncio.run(run(args, domain_ids))
+    report = {
+        "commit": _git_commit(),
+        "database": database.split("@")[-1],
+        "domains": args.domains,
+        "apps_per_domain": args.apps_per_domain,
+        "requests": args.requests,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", type=int, default=200)
+    parser.add_argument("--apps-per-domain", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per route and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--routes", nargs="+", help="Only run these scenarios")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--use-env-db", action="store_true", help="Seed and load the configured database")
+    main(parser.parse_args())
@@ -0,0 +1,58 @@
+"""
+Measure producer batching and throughput against the in-memory fake broker.
+
+Sends ``--messages`` outbox-sized events through KafkaProducer for each linger
+setting and reports messages/sec and the number of produce requests the broker saw.
+
+Usage:
+    python -m benchmarks.kafka_producer --messages 100000 --linger-ms 0 5 20
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.events.kafka_client import InMemoryKafkaBroker, InMemoryKafkaProducer, KafkaProducer
+
+PAYLOAD = json.dumps({"event_type": "application_created", "application_id": 1, "application_name": "x" * 40}).encode()
+
+
+async def run(messages: int, linger_ms: int, max_batch_size: int, max_in_flight: int) -> dict:
+    broker = InMemoryKafkaBroker()
+    producer = KafkaProducer(
+        InMemoryKafkaProducer(broker, linger_ms=linger_ms, max_batch_size=max_batch_size),
+        max_in_flight=max_in_flight,
+    )
+    await producer.start()
+    started = time.perf_counter()
+    deliveries = [
+        await producer.send("bench-events", value=PAYLOAD, key=str(i % 1000).encode())
+        for i in range(messages)
+    ]
+    await asyncio.gather(*deliveries)
+    elapsed = time.perf_counter() - started
+    await producer.stop()
+    return {
+        "linger_ms": linger_ms,
+        "messages": messages,
+        "produce_requests": len(broker.produce_requests),
+        "avg_batch": round(messages / len(broker.produce_requests), 1),
+        "messages_per_s": round(messages / elapsed),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    results = [
+        await run(args.messages, linger_ms, args.max_batch_size, args.max_in_flight)
+        for linger_ms in args.linger_ms
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--linger-ms", type=int, nargs="+", default=[0, 5, 20])
+    parser.add_argument("--max-batch-size", type=int, default=65536)
+    parser.add_argument("--max-in-flight", type=int, default=10000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,76 @@
+"""
+Check that the nested domain endpoints run a constant number of queries per page.
+
+Seeds ``--domains`` domains with ``--apps-per-domain`` applications each into a scratch
+SQLite database (or the configured database with ``--use-env-db``), then
+counts the statements executed by ``?include=applications`` requests for several page
+sizes and for one domain. Exits non-zero if the count grows with the page size, i.e. on an
+N+1 regression, or if the detail route runs more statements than a page. The same checks
+run in the test suite (tests/test_query_counts.py).
+
+Usage:
+    python -m benchmarks.query_counts --domains 200 --apps-per-domain 5 --page-sizes 1 10 100
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from benchmarks.seed import configure_database, seed
+
+
+async def count_queries(page_sizes, domain_id: int) -> dict:
+    import httpx
+    from sqlalchemy import event
+
+    from app.db.session import async_engine
+    from app.main import app
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for limit in page_sizes:
+            statements.clear()
+            response = await client.get(
+                "/api/v1/domains/get_all_domains/", params={"limit": limit, "include": "applications"}
+            )
+            response.raise_for_status()
+            results[f"list_limit_{limit}"] = len(statements)
+        statements.clear()
+        response = await client.get(f"/api/v1/domains/get_domain/{domain_id}", params={"include": "applications"})
+        response.raise_for_status()
+        results["detail"] = len(statements)
+    event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return results
+
+
+def main(args: argparse.Namespace) -> int:
+    configure_database(args.use_env_db)
+    domain_ids = seed(args.domains, args.apps_per_domain, prefix="qc")
+    results = asyncio.run(count_queries(args.page_sizes, domain_ids[0]))
+    print(json.dumps(results, indent=2))
+    list_counts = {count for key, count in results.items() if key.startswith("list_")}
+    if len(list_counts) != 1:
+        print("query count grows with the page size", file=sys.stderr)
+        return 1
+    if results["detail"] > min(list_counts):
+        print("the detail route runs more queries than a list page", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", type=int, default=200)
+    parser.add_argument("--apps-per-domain", type=int, default=5)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument(
+        "--use-env-db", action="store_true", help="Seed and query the configured database instead of a scratch SQLite file"
+    )
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,61 @@
+"""
+Shared database setup for the benchmark scripts.
+
+``configure_database`` must be called before any ``app`` module is imported, as the
+engines are built at import time.
+"""
+import os
+import tempfile
+from typing import List
+
+
+def configure_database(use_env_db: bool) -> str:
+    """Point the app at a scratch SQLite file unless the configured database should be used"""
+    if not use_env_db:
+        path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+        os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    return os.environ.get("SQLALCHEMY_DATABASE_URI", "settings / .env")
+
+
+def seed(domains: int, apps_per_domain: int, prefix: str = "bench") -> List[int]:
+    """
+    Create the tables if needed and replace the rows named after ``prefix``
+
+    Domains are named ``{prefix}-domain-{i}`` and their applications ``app-{j}``. The bulk
+    inserts bypass the CRUD layer, so the domain stats summary is rebuilt afterwards.
+    Returns the ids of the seeded domains.
+    """
+    from app.crud.domain_stats import rebuild_domain_stats
+    from app.db.session import Base, SessionLocal, engine
+    from app.models.application import Application
+    from app.models.domain import Domain
+    import app.db.base  # noqa: F401  registers every model on Base.metadata
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        pattern = f"{prefix}-%"
+        db.query(Application).filter(Application.domain_name.like(pattern)).delete(synchronize_session=False)
+        db.query(Domain).filter(Domain.domain_name.like(pattern)).delete(synchronize_session=False)
+        db.bulk_insert_mappings(Domain, [
+            {"domain_name": f"{prefix}-domain-{i}", "domain_code": f"{prefix}-code-{i}"} for i in range(domains)
+        ])
+        db.bulk_insert_mappings(Application, [
+            {
+                "application_name": f"app-{j}",
+                "application_code": f"{prefix}-app-{i}-{j}",
+                "domain_name": f"{prefix}-domain-{i}",
+                "description": f"Application {j} of {prefix} domain {i}",
+                "config": {"tier": "gold" if j % 2 else "silver", "features": {"audit": j % 3 == 0}},
+            }
+            for i in range(domains)
+            for j in range(apps_per_domain)
+        ])
+        db.commit()
+        rebuild_domain_stats(db)
+        return [
+            row.id
+            for row in db.query(Domain.id).filter(Domain.domain_name.like(pattern)).order_by(Domain.id)
+        ]
+    finally:
+        db.close()
@@ -0,0 +1,88 @@
+"""
+Compare the CPU cost of a list page on the validated and the fast serialization paths.
+
+Seeds ``--domains`` domains with ``--apps-per-domain`` applications each, then requests
+pages of ``--page-size`` rows from each list route ``--requests`` times with
+FAST_LIST_RESPONSES off (ORM objects validated against the response model, stdlib json)
+and on (plain rows encoded by FastJSONResponse). Requests go through an in-process ASGI
+client, one at a time, so the process CPU time measured around each request is the cost
+of that page. The report gives median CPU and database milliseconds per page and the
+speedup of the fast path.
+
+Usage:
+    python -m benchmarks.serialization --page-size 100 --requests 200
+    python -m benchmarks.serialization --use-env-db --routes get_all_applications
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from benchmarks.seed import configure_database, seed
+
+API = "/api/v1"
+
+ROUTES = {
+    "get_all_applications": lambda domain: f"{API}/applications/get_all_applications",
+    "get_applications_by_domain_name": lambda domain: f"{API}/applications/get_applications_by_domain_name/{domain}",
+    "get_all_domains": lambda domain: f"{API}/domains/get_all_domains/",
+}
+
+
+async def measure(path: str, page_size: int, requests: int, fast: bool) -> Dict[str, float]:
+    import httpx
+
+    from app.core.config import settings
+    from app.main import app
+
+    settings.FAST_LIST_RESPONSES = fast
+    cpu_ms: List[float] = []
+    db_ms: List[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(requests + 10):
+            started = time.process_time()
+            response = await client.get(path, params={"limit": page_size})
+            elapsed = time.process_time() - started
+            response.raise_for_status()
+            # The first requests warm up caches and the connection pool
+            if i >= 10:
+                cpu_ms.append(elapsed * 1000)
+                db_ms.append(float(response.headers.get("x-db-time-ms", 0)))
+    return {
+        "cpu_ms_per_page": round(statistics.median(cpu_ms), 3),
+        "db_ms_per_page": round(statistics.median(db_ms), 3),
+        "rows_per_page": len(response.json()),
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    configure_database(args.use_env_db)
+    seed(args.domains, args.apps_per_domain, prefix="ser")
+    domain = "ser-domain-0"
+    report = {}
+    for name in args.routes:
+        path = ROUTES[name](domain)
+        validated = asyncio.run(measure(path, args.page_size, args.requests, fast=False))
+        fast = asyncio.run(measure(path, args.page_size, args.requests, fast=True))
+        report[name] = {
+            "validated": validated,
+            "fast": fast,
+            "cpu_speedup": round(validated["cpu_ms_per_page"] / fast["cpu_ms_per_page"], 2),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", type=int, default=200)
+    parser.add_argument("--apps-per-domain", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--routes", nargs="+", choices=sorted(ROUTES), default=sorted(ROUTES))
+    parser.add_argument(
+        "--use-env-db", action="store_true", help="Seed and query the configured database instead of a scratch SQLite file"
+    )
+    main(parser.parse_args())
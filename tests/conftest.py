@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+import pytest
+
+# The engines are built when app.db.session is imported, so the scratch database and the
+# background machinery switches must be in the environment before any app module is loaded
+_DATABASE = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{_DATABASE}"
+os.environ["SQLALCHEMY_ASYNC_DATABASE_URI"] = f"sqlite+aiosqlite:///{_DATABASE}"
+os.environ["KAFKA_CONSUMERS_ENABLED"] = "false"
+os.environ["OUTBOX_RELAY_ENABLED"] = "false"
+
+
+@pytest.fixture
+def client():
+    """A TestClient for the app on an empty SQLite database"""
+    from fastapi.testclient import TestClient
+
+    from app.crud.domain import domain_cache
+    from app.db.base import Base
+    from app.db.counts import count_cache
+    from app.db.session import engine
+    from app.main import app
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    domain_cache.clear()
+    count_cache.clear()
+    with TestClient(app) as client:
+        yield client
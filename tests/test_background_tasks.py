@@ -0,0 +1,43 @@
+import asyncio
+import logging
+
+from app.events import kafka_client
+from app.events.consumers import engine as engine_module
+from app.events.consumers.engine import EventConsumer
+from app.main import _start_task, _stop_task
+
+
+def test_consumer_retries_until_the_broker_is_reachable(monkeypatch):
+    attempts = []
+
+    async def get_consumer(topic, listener=None):
+        attempts.append(topic)
+        if len(attempts) == 1:
+            raise ConnectionError("broker unreachable")
+        return kafka_client.MockKafkaConsumer(topic)
+
+    monkeypatch.setattr(engine_module, "get_consumer", get_consumer)
+
+    async def scenario():
+        engine = EventConsumer("startup-test")
+        task = asyncio.create_task(engine.run())
+        while engine._consumer is None:
+            await asyncio.sleep(0.05)
+        await _stop_task(task)
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert attempts == ["startup-test", "startup-test"]
+
+
+def test_stopping_a_failed_task_does_not_raise(caplog):
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        task = _start_task(fail(), "failing-task")
+        await asyncio.sleep(0)
+        await _stop_task(task)
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(scenario())
+    assert "Background task failing-task failed: boom" in caplog.text
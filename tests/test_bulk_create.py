@@ -0,0 +1,58 @@
+from sqlalchemy import delete, insert
+
+from app.crud import application as application_crud
+from app.models.application import Application
+from app.models.domain import Domain
+
+API = "/api/v1"
+
+
+def create_domains(client, *names):
+    response = client.post(f"{API}/domains/bulk", json={"items": [
+        {"domain_name": name, "domain_code": name} for name in names
+    ]})
+    assert response.status_code == 200 and not response.json()["errors"]
+
+
+def race_before_insert(monkeypatch, write):
+    """Run write in the bulk create's session right after its existence checks"""
+    original = application_crud.insert_returning_or_reject
+
+    def insert_returning_or_reject(db, *args, **kwargs):
+        write(db)
+        return original(db, *args, **kwargs)
+
+    monkeypatch.setattr(application_crud, "insert_returning_or_reject", insert_returning_or_reject)
+
+
+def test_domain_deleted_before_insert_rejects_only_its_items(client, monkeypatch):
+    create_domains(client, "billing", "search")
+    race_before_insert(monkeypatch, lambda db: db.execute(delete(Domain.__table__).where(Domain.domain_name == "search")))
+
+    response = client.post(f"{API}/applications/bulk", json={"items": [
+        {"application_name": "invoices", "application_code": "invoices", "domain_name": "billing"},
+        {"application_name": "indexer", "application_code": "indexer", "domain_name": "search"},
+        {"application_name": "payments", "application_code": "payments", "domain_name": "billing"},
+    ]})
+
+    assert response.status_code == 200
+    assert [row["application_code"] for row in response.json()["created"]] == ["invoices", "payments"]
+    assert response.json()["errors"] == [{"index": 1, "detail": "Domain not found"}]
+    stats = client.get(f"{API}/domains/stats").json()
+    assert [(row["domain_name"], row["application_count"]) for row in stats] == [("billing", 2)]
+
+
+def test_application_created_before_insert_is_skipped(client, monkeypatch):
+    create_domains(client, "billing")
+    race_before_insert(monkeypatch, lambda db: db.execute(insert(Application.__table__).values(
+        application_name="other", application_code="invoices", domain_name="billing"
+    )))
+
+    response = client.post(f"{API}/applications/bulk", json={"items": [
+        {"application_name": "invoices", "application_code": "invoices", "domain_name": "billing"},
+        {"application_name": "payments", "application_code": "payments", "domain_name": "billing"},
+    ]})
+
+    assert response.status_code == 200
+    assert [row["application_code"] for row in response.json()["created"]] == ["payments"]
+    assert response.json()["errors"] == [{"index": 0, "detail": "Application code or name already registered"}]
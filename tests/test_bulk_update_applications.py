@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from app.crud import application as application_crud
+from app.crud.domain_stats import rebuild_domain_stats
+from app.db.session import SessionLocal
+from app.models.outbox import OutboxEvent
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def applications(client):
+    """Ids of the applications per domain: five in billing, two in search"""
+    ids = {}
+    for domain_name, count in (("billing", 5), ("search", 2)):
+        response = client.post(
+            f"{API}/domains/create_domain/", json={"domain_name": domain_name, "domain_code": domain_name}
+        )
+        assert response.status_code == 201
+        response = client.post(f"{API}/applications/bulk", json={"items": [
+            {"application_name": f"app-{i}", "application_code": f"{domain_name}-{i}", "domain_name": domain_name}
+            for i in range(count)
+        ]})
+        assert response.status_code == 200 and not response.json()["errors"]
+        ids[domain_name] = [row["id"] for row in response.json()["created"]]
+    return ids
+
+
+def bulk_updated_events():
+    db = SessionLocal()
+    try:
+        events = [(event.key, json.loads(event.payload)) for event in db.query(OutboxEvent).order_by(OutboxEvent.id)]
+    finally:
+        db.close()
+    return [(key, payload) for key, payload in events if payload["event_type"] == "applications_bulk_updated"]
+
+
+def assert_stats_match_rebuild():
+    db = SessionLocal()
+    try:
+        assert rebuild_domain_stats(db)["drifted"] == 0
+    finally:
+        db.close()
+
+
+def test_update_by_ids_stages_one_event_per_domain(client, applications, monkeypatch):
+    monkeypatch.setattr(application_crud, "BULK_UPDATED_EVENT_MAX_IDS", 2)
+    ids = applications["billing"][:3] + applications["search"]
+
+    response = client.patch(f"{API}/applications/bulk", json={"ids": ids + [999], "changes": {"status": False}})
+
+    assert response.status_code == 200
+    assert response.json() == {"updated": 5, "ids": sorted(ids), "next_cursor": None}
+    billing, search = applications["billing"], applications["search"]
+    assert [(key, event["domain_name"], event["application_ids"]) for key, event in bulk_updated_events()] == [
+        ("billing", "billing", billing[:2]),
+        ("billing", "billing", billing[2:3]),
+        ("search", "search", search),
+    ]
+    stats = {entry["domain_name"]: entry for entry in client.get(f"{API}/domains/stats").json()}
+    assert (stats["billing"]["active_count"], stats["billing"]["inactive_count"]) == (2, 3)
+    assert (stats["search"]["active_count"], stats["search"]["inactive_count"]) == (0, 2)
+    assert_stats_match_rebuild()
+
+
+def test_update_by_domain_pages_through_the_domain(client, applications):
+    request = {"domain_name": "billing", "limit": 2, "changes": {"action": "deploy"}}
+    pages = []
+    cursor = None
+    while True:
+        response = client.patch(f"{API}/applications/bulk", json={**request, "cursor": cursor})
+        assert response.status_code == 200
+        pages.append(response.json()["ids"])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    billing = applications["billing"]
+    assert pages == [billing[0:2], billing[2:4], billing[4:5]]
+    assert [event["application_ids"] for _, event in bulk_updated_events()] == pages
+    assert {key for key, _ in bulk_updated_events()} == {"billing"}
+    # The other domain was not touched
+    search = client.get(f"{API}/applications/get_applications_by_domain_name/search").json()
+    assert [application["action"] for application in search] == [None, None]
+    assert_stats_match_rebuild()
+
+
+def test_update_by_domain_with_filter_only_counts_matching_rows(client, applications):
+    client.patch(f"{API}/applications/bulk", json={"ids": applications["billing"][:3], "changes": {"status": False}})
+
+    response = client.patch(f"{API}/applications/bulk", json={
+        "domain_name": "billing", "filter": {"status": False}, "limit": 2, "changes": {"status": True},
+    })
+
+    assert response.json()["ids"] == applications["billing"][:2]
+    assert response.json()["next_cursor"] is not None
+    assert_stats_match_rebuild()
+
+
+def test_cursor_of_another_domain_is_rejected(client, applications):
+    response = client.patch(f"{API}/applications/bulk", json={
+        "domain_name": "billing", "limit": 2, "changes": {"action": "deploy"},
+    })
+    cursor = response.json()["next_cursor"]
+
+    for request in (
+        {"domain_name": "search", "cursor": cursor},
+        {"ids": applications["search"], "cursor": cursor},
+    ):
+        response = client.patch(f"{API}/applications/bulk", json={**request, "changes": {"action": "deploy"}})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Cursor does not belong to this domain"
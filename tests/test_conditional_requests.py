@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import text
+
+from app.db.session import engine
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def domain(client):
+    response = client.post(f"{API}/domains/create_domain/", json={"domain_name": "billing", "domain_code": "billing"})
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.fixture
+def application(client, domain):
+    response = client.post(f"{API}/applications/create_application/", json={
+        "application_name": "invoices", "application_code": "invoices", "domain_name": domain["domain_name"],
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def backdate(table: str) -> None:
+    # SQLite timestamps have second precision, so writes in the same second share a version;
+    # moving the rows into the past makes the next write produce a new one
+    with engine.begin() as conn:
+        conn.execute(text(f"UPDATE {table} SET created_at = '2020-01-01 00:00:00', updated_at = NULL"))
+
+
+ROUTES = {
+    "domains": ("/domains/get_domain/{id}", "/domains/update_domain/{id}"),
+    "applications": ("/applications/get_application/{id}", "/applications/update_application/{id}"),
+}
+
+
+@pytest.fixture(params=sorted(ROUTES))
+def resource(request, client, application):
+    table = request.param
+    row_id = application["id"] if table == "applications" else 1
+    get_path, put_path = (f"{API}{path.format(id=row_id)}" for path in ROUTES[table])
+    backdate(table)
+    return table, get_path, put_path
+
+
+def test_if_none_match_returns_304_for_the_current_etag(client, resource):
+    _, get_path, _ = resource
+    etag = client.get(get_path).headers["ETag"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get(get_path, headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+    assert client.get(get_path, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_update_changes_the_etag(client, resource):
+    _, get_path, put_path = resource
+    etag = client.get(get_path).headers["ETag"]
+
+    response = client.put(put_path, json={"description": "changed"}, headers={"If-Match": etag})
+
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+    assert client.get(get_path).headers["ETag"] == new_etag
+    assert client.get(get_path, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_stale_if_match_returns_412_and_leaves_the_row_alone(client, resource):
+    _, get_path, put_path = resource
+    etag = client.get(get_path).headers["ETag"]
+    assert client.put(put_path, json={"description": "first"}, headers={"If-Match": etag}).status_code == 200
+
+    for if_match in (etag, f"W/{client.get(get_path).headers['ETag']}", '"garbage"'):
+        response = client.put(put_path, json={"description": "second"}, headers={"If-Match": if_match})
+        assert response.status_code == 412
+    assert client.get(get_path).json()["description"] == "first"
+    assert client.put(put_path, json={"description": "any"}, headers={"If-Match": "*"}).status_code == 200
+
+
+def test_if_match_on_a_missing_row_returns_404(client, resource):
+    _, get_path, put_path = resource
+    etag = client.get(get_path).headers["ETag"]
+    missing = put_path.rsplit("/", 1)[0] + "/999"
+
+    response = client.put(missing, json={"description": "x"}, headers={"If-Match": etag})
+
+    assert response.status_code == 404
+
+
+def test_list_page_honours_if_none_match(client, application):
+    path = f"{API}/applications/get_all_applications"
+    etag = client.get(path).headers["ETag"]
+
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+    client.post(f"{API}/applications/create_application/", json={
+        "application_name": "refunds", "application_code": "refunds", "domain_name": application["domain_name"],
+    })
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+from app.events import kafka_client
+from app.events.consumers.engine import EventConsumer
+from app.events.kafka_client import InMemoryKafkaBroker, TopicPartition
+
+TOPIC = "rebalance-test"
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = InMemoryKafkaBroker(partitions=3)
+    monkeypatch.setattr(kafka_client.settings, "KAFKA_CONSUMER_BACKEND", "memory")
+    monkeypatch.setattr(kafka_client, "memory_broker", broker)
+    return broker
+
+
+def produce(broker, partition, *sequence_numbers):
+    broker.append_batch(TOPIC, partition, [
+        (f"key-{seq}".encode(), json.dumps({"event_type": "test", "partition": partition, "seq": seq}).encode())
+        for seq in sequence_numbers
+    ])
+
+
+async def wait_for(condition, timeout=5.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_rebalance_stops_revoked_workers_and_commits_their_offsets(broker, caplog):
+    async def scenario():
+        handled = []
+        release_partition_2 = asyncio.Event()
+
+        async def handler(event):
+            if event["partition"] == 2 and event["seq"] == 1:
+                # Still running when partition 2 is revoked
+                await release_partition_2.wait()
+            handled.append((event["partition"], event["seq"]))
+
+        engine = EventConsumer(TOPIC, max_concurrency=8, max_pending=2, max_records=100)
+        engine.register_handler("test", handler)
+        produce(broker, 0, 0, 1)
+        produce(broker, 1, 0, 1, 2)
+        produce(broker, 2, 0)
+        task = asyncio.create_task(engine.run())
+        await wait_for(lambda: {(0, 1), (1, 2), (2, 0)} <= set(handled))
+        produce(broker, 2, 1, 2)
+        await wait_for(lambda: engine._workers.get(TopicPartition(TOPIC, 2)) is not None
+                       and engine._workers[TopicPartition(TOPIC, 2)].pending > 0)
+        consumer = engine._consumer
+        # Partition 2 has messages pending, so backpressure has paused it
+        assert TopicPartition(TOPIC, 2) in consumer.paused()
+
+        await consumer.rebalance([0])
+
+        assert set(engine._workers) <= {TopicPartition(TOPIC, 0)}
+        # Finished batches were committed before release; the blocked batch was not
+        assert consumer.committed[TopicPartition(TOPIC, 1)] == 3
+        assert consumer.committed[TopicPartition(TOPIC, 2)] == 1
+        release_partition_2.set()
+        produce(broker, 0, 2)
+        produce(broker, 1, 3)
+        await wait_for(lambda: (0, 2) in handled)
+        await asyncio.sleep(0.2)
+        # The cancelled handler did not finish, and the revoked partitions are not consumed
+        assert (2, 1) not in handled and (1, 3) not in handled
+
+        # Taking the partitions back replays from the committed offsets
+        await consumer.rebalance([0, 1, 2])
+        await wait_for(lambda: {(1, 3), (2, 1), (2, 2)} <= set(handled))
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return consumer
+
+    with caplog.at_level(logging.ERROR):
+        consumer = asyncio.run(scenario())
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+    assert consumer.committed == {
+        TopicPartition(TOPIC, 0): 3, TopicPartition(TOPIC, 1): 4, TopicPartition(TOPIC, 2): 3
+    }
@@ -0,0 +1,52 @@
+from app.crud.domain_stats import rebuild_domain_stats
+from app.db.session import SessionLocal
+
+API = "/api/v1"
+
+
+def create_application(client, name, domain_name, **fields):
+    response = client.post(f"{API}/applications/create_application/", json={
+        "application_name": name, "application_code": name, "domain_name": domain_name, **fields,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_maintained_stats_match_a_rebuild_after_mixed_writes(client):
+    for name in ("billing", "search", "archive"):
+        response = client.post(f"{API}/domains/create_domain/", json={"domain_name": name, "domain_code": name})
+        assert response.status_code == 201
+
+    invoices = create_application(client, "invoices", "billing")
+    refunds = create_application(client, "refunds", "billing", action="deploy")
+    create_application(client, "indexer", "search", status=False)
+    create_application(client, "old-logs", "archive")
+    response = client.post(f"{API}/applications/bulk", json={"items": [
+        {"application_name": f"bulk-{i}", "application_code": f"bulk-{i}", "domain_name": "search",
+         "action": "deploy" if i % 2 else None}
+        for i in range(6)
+    ]})
+    assert response.status_code == 200 and not response.json()["errors"]
+    bulk_ids = [row["id"] for row in response.json()["created"]]
+
+    # Status/action changes and a move to another domain
+    client.put(f"{API}/applications/update_application/{invoices}", json={"status": False, "action": "hold"})
+    client.put(f"{API}/applications/update_application/{refunds}", json={"domain_name": "search"})
+    client.patch(f"{API}/applications/bulk", json={"ids": bulk_ids[:3], "changes": {"action": "retire"}})
+    client.patch(f"{API}/applications/bulk", json={
+        "domain_name": "search", "filter": {"action": "deploy"}, "changes": {"status": False}, "limit": 2,
+    })
+    assert client.delete(f"{API}/applications/delete_application/{bulk_ids[5]}").status_code == 204
+    # Deleting a domain drops its applications through ON DELETE CASCADE
+    assert client.delete(f"{API}/domains/delete_domain/3").status_code == 204
+
+    maintained = client.get(f"{API}/domains/stats").json()
+    db = SessionLocal()
+    try:
+        assert rebuild_domain_stats(db)["drifted"] == 0
+    finally:
+        db.close()
+    assert client.get(f"{API}/domains/stats").json() == maintained
+    assert [(entry["domain_name"], entry["application_count"]) for entry in maintained] == [
+        ("billing", 1), ("search", 7)
+    ]
@@ -0,0 +1,50 @@
+import pytest
+
+from app.db.instrumentation import QUERY_COUNT_HEADER
+
+API = "/api/v1"
+PAGE_SIZES = (1, 10, 100)
+
+
+@pytest.fixture
+def seeded(client):
+    # More domains than the largest page, each with a few applications
+    response = client.post(f"{API}/domains/bulk", json={"items": [
+        {"domain_name": f"domain-{i:03}", "domain_code": f"code-{i:03}"} for i in range(120)
+    ]})
+    assert response.status_code == 200 and not response.json()["errors"]
+    response = client.post(f"{API}/applications/bulk", json={"items": [
+        {"application_name": f"app-{j}", "application_code": f"app-{i:03}-{j}", "domain_name": f"domain-{i:03}"}
+        for i in range(120)
+        for j in range(3)
+    ]})
+    assert response.status_code == 200 and not response.json()["errors"]
+    return client
+
+
+def query_count(client, path, **params):
+    response = client.get(f"{API}{path}", params=params)
+    assert response.status_code == 200, response.text
+    return int(response.headers[QUERY_COUNT_HEADER])
+
+
+@pytest.mark.parametrize("include, expected", [(None, 1), ("applications", 2)])
+def test_domain_list_runs_a_fixed_number_of_queries_per_page(seeded, include, expected):
+    params = {"include": include} if include else {}
+    counts = {limit: query_count(seeded, "/domains/get_all_domains/", limit=limit, **params) for limit in PAGE_SIZES}
+    assert set(counts.values()) == {expected}, counts
+
+
+@pytest.mark.parametrize("path", [
+    "/applications/get_all_applications",
+    "/applications/get_applications_by_domain_name/domain-005",
+])
+def test_application_lists_run_one_query_per_page(seeded, path):
+    counts = {limit: query_count(seeded, path, limit=limit) for limit in PAGE_SIZES}
+    assert set(counts.values()) == {1}, counts
+
+
+@pytest.mark.parametrize("include, expected", [(None, 1), ("applications", 2)])
+def test_domain_detail_runs_a_fixed_number_of_queries(seeded, include, expected):
+    params = {"include": include} if include else {}
+    assert query_count(seeded, "/domains/get_domain/5", **params) == expected
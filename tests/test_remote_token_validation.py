@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import security
+from app.core.security import AuthServiceUnavailableError, verify_token_remote
+
+
+@pytest.fixture(autouse=True)
+def clear_token_state():
+    security.token_cache.clear()
+    security._pending_validations.clear()
+    yield
+    security.token_cache.clear()
+    security._pending_validations.clear()
+
+
+def test_cancelled_request_does_not_fail_coalesced_waiters(monkeypatch):
+    calls = []
+
+    async def validate_remote(token):
+        calls.append(token)
+        await asyncio.sleep(0.05)
+        return {"sub": "user-1"}
+
+    monkeypatch.setattr(security, "_validate_remote", validate_remote)
+
+    async def scenario():
+        leader = asyncio.create_task(verify_token_remote("token"))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(verify_token_remote("token")) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return results
+
+    assert asyncio.run(scenario()) == [{"sub": "user-1"}] * 3
+    assert calls == ["token"]
+    assert not security._pending_validations
+
+
+def test_auth_service_outage_is_not_an_invalid_token(monkeypatch):
+    async def get(self, url, **kwargs):
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", get)
+
+    async def scenario():
+        try:
+            with pytest.raises(AuthServiceUnavailableError):
+                await verify_token_remote("token")
+        finally:
+            await security.close_auth_client()
+
+    asyncio.run(scenario())
+    assert security.token_cache.get(security._token_key("token")) is None
+
+
+@pytest.mark.parametrize("content, content_type", [
+    (b"<html>Bad gateway</html>", "text/html"),
+    (b'["not", "claims"]', "application/json"),
+])
+def test_malformed_validation_response_is_an_outage(monkeypatch, content, content_type):
+    async def get(self, url, **kwargs):
+        return httpx.Response(200, content=content, headers={"Content-Type": content_type})
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", get)
+
+    async def scenario():
+        try:
+            with pytest.raises(AuthServiceUnavailableError):
+                await verify_token_remote("token")
+        finally:
+            await security.close_auth_client()
+
+    asyncio.run(scenario())
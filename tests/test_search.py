@@ -0,0 +1,25 @@
+import pytest
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def domains(client):
+    response = client.post(f"{API}/domains/bulk", json={"items": [
+        {"domain_name": name, "domain_code": name} for name in ("billing", "bill-pay", "search")
+    ]})
+    assert response.status_code == 200 and not response.json()["errors"]
+
+
+@pytest.mark.parametrize("path", ["domains/search", "applications/search"])
+@pytest.mark.parametrize("q", ["b", "bi"])
+def test_search_needs_a_whole_trigram(client, domains, path, q):
+    # Shorter patterns cannot use the trigram indexes
+    assert client.get(f"{API}/{path}", params={"q": q}).status_code == 422
+
+
+def test_search_three_characters(client, domains):
+    response = client.get(f"{API}/domains/search", params={"q": "bil"})
+
+    assert response.status_code == 200
+    assert sorted(domain["domain_name"] for domain in response.json()) == ["bill-pay", "billing"]